@@ -4,12 +4,20 @@ import random
 import time
 import uuid
 import logging
+import math
+from datetime import datetime
 from functools import wraps
 from flask import Flask, jsonify, request, redirect
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 import jwt
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
 # Import database query functions
 from data_access.api_queries import (
     get_all_models,
@@ -31,7 +39,31 @@ def _get_completed_games_dir() -> str:
 
 _BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes responses with orjson.
+
+    Output matches Flask's default provider: keys are sorted, and dates,
+    Decimals and UUIDs go through the same fallback (so datetimes are still
+    HTTP dates and Decimals strings). Falls back to the stdlib encoder when
+    orjson is not installed.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 logging.basicConfig(level=logging.INFO)
 TOP_MATCH_CACHE_SECONDS = int(os.getenv("TOP_MATCH_CACHE_SECONDS", "900"))
 _top_apples_cache = {"timestamp": 0.0, "payload": None}
@@ -181,6 +213,27 @@ def get_model_details(model_name):
         return jsonify({"error": "Failed to load model details"}), 500
 
 
+def _parse_games_cursor_value(sort_by, raw):
+    """
+    Convert a next_cursor after_value back to the type of the sort column.
+
+    start_time takes an ISO timestamp; total_score and rounds take a finite
+    number. An absent or empty value is the cursor of a game whose sort
+    column is NULL. Raises ValueError for anything else.
+    """
+    if raw is None or raw == "":
+        return None
+    if sort_by == "start_time":
+        return datetime.fromisoformat(raw)
+    try:
+        return int(raw)
+    except ValueError:
+        value = float(raw)
+    if not math.isfinite(value):
+        raise ValueError(f"after_value must be finite, got {raw!r}")
+    return value
+
+
 # Endpoint to get a list of games - returns metadata with local replay paths
 # Mimics functionality in frontend/src/app/api/games/route.ts
 @app.route("/api/games", methods=["GET"])
@@ -191,9 +244,22 @@ def get_games_endpoint():
         limit = request.args.get("limit", default=10, type=int)
         offset = request.args.get("offset", default=0, type=int)
         sort_by = request.args.get("sort_by", default="start_time", type=str)
+        if sort_by not in ("start_time", "total_score", "rounds"):
+            sort_by = "start_time"
+
+        # Keyset cursor from a previous response's next_cursor; seeks past
+        # the last game seen instead of skipping `offset` rows
+        after = None
+        after_id = request.args.get("after_id", type=str)
+        if after_id:
+            try:
+                after_value = _parse_games_cursor_value(sort_by, request.args.get("after_value", type=str))
+            except ValueError:
+                return jsonify({"error": f"Invalid after_value for sort_by={sort_by}"}), 400
+            after = (after_value, after_id)
 
         # Get games from database
-        games_data = get_games(limit=limit, offset=offset, sort_by=sort_by)
+        games_data = get_games(limit=limit, offset=offset, sort_by=sort_by, after=after)
 
         games_list = []
         for game_data in games_data:
@@ -221,8 +287,13 @@ def get_games_endpoint():
             }
             games_list.append(game_metadata)
 
+        next_cursor = None
+        if games_data and len(games_data) == limit:
+            last_game = games_data[-1]
+            next_cursor = {"after_value": last_game.get(sort_by), "after_id": last_game.get('id')}
+
         print(f"Returning {len(games_list)} games")
-        return jsonify({"games": games_list})
+        return jsonify({"games": games_list, "next_cursor": next_cursor})
 
     except Exception as error:
         logging.error(f"Error fetching games: {error}")
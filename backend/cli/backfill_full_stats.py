@@ -14,44 +14,42 @@ from __future__ import annotations
 import argparse
 import os
 import sys
+from itertools import islice
 from typing import Iterable, Iterator, List
 
+import psycopg2.extensions
 from dotenv import load_dotenv
 
 # Add backend to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from database_postgres import get_connection  # noqa: E402
-from data_access import (  # noqa: E402
-    update_model_aggregates,
-    update_trueskill_ratings,
-)
+from database_postgres import ensure_replay_indexes, get_pool  # noqa: E402
+from data_access import update_aggregates_and_trueskill_batch  # noqa: E402
 from services.trueskill_engine import (  # noqa: E402
     DEFAULT_MU,
     DEFAULT_SIGMA,
-    DISPLAY_MULTIPLIER,
+    BASELINE_DISPLAY_RATING,
 )
 
 
 def reset_models_to_baseline() -> int:
     """
     Reset TrueSkill and aggregate counters to baseline for all models.
+    Rows already at baseline are left alone.
 
     Returns:
-        Number of rows updated.
+        Number of rows changed.
     """
-    conn = get_connection()
+    conn = get_pool().getconn()
     cursor = conn.cursor()
     try:
-        exposed = DEFAULT_MU - 3 * DEFAULT_SIGMA
-        display = exposed * DISPLAY_MULTIPLIER
         cursor.execute(
             """
             UPDATE models
-            SET trueskill_mu = %s,
-                trueskill_sigma = %s,
+            SET trueskill_mu = %(mu)s,
+                trueskill_sigma = %(sigma)s,
                 trueskill_updated_at = NOW(),
-                elo_rating = %s,
+                elo_rating = %(display)s,
                 wins = 0,
                 losses = 0,
                 ties = 0,
@@ -59,14 +57,23 @@ def reset_models_to_baseline() -> int:
                 games_played = 0,
                 last_played_at = NULL,
                 updated_at = NOW()
+            WHERE trueskill_mu IS DISTINCT FROM %(mu)s
+               OR trueskill_sigma IS DISTINCT FROM %(sigma)s
+               OR elo_rating IS DISTINCT FROM %(display)s
+               OR wins IS DISTINCT FROM 0
+               OR losses IS DISTINCT FROM 0
+               OR ties IS DISTINCT FROM 0
+               OR apples_eaten IS DISTINCT FROM 0
+               OR games_played IS DISTINCT FROM 0
+               OR last_played_at IS NOT NULL
             """,
-            (DEFAULT_MU, DEFAULT_SIGMA, display),
+            {"mu": DEFAULT_MU, "sigma": DEFAULT_SIGMA, "display": BASELINE_DISPLAY_RATING},
         )
         conn.commit()
         return cursor.rowcount
     finally:
         cursor.close()
-        conn.close()
+        get_pool().putconn(conn)
 
 
 def stream_game_ids(
@@ -77,6 +84,11 @@ def stream_game_ids(
 ) -> Iterator[str]:
     """
     Yield game ids in chronological order without loading the whole table.
+
+    Rows are streamed through a server-side cursor, `batch_size` at a time,
+    so the scan is a single ordered query rather than repeated
+    LIMIT/OFFSET pages that each re-sort and skip everything before them.
+    A plain tuple cursor is used since only the id is read per row.
     """
     where_clause = "" if include_failed else "WHERE status = 'completed'"
     query = f"""
@@ -87,33 +99,18 @@ def stream_game_ids(
         LIMIT %s OFFSET %s
     """
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    fetched = 0
-    current_offset = offset
+    conn = get_pool().getconn()
+    cursor = conn.cursor(name="backfill_game_ids", cursor_factory=psycopg2.extensions.cursor)
+    cursor.itersize = batch_size
 
     try:
-        while True:
-            take = batch_size
-            if limit is not None:
-                remaining = limit - fetched
-                if remaining <= 0:
-                    break
-                take = min(take, remaining)
-
-            cursor.execute(query, (take, current_offset))
-            rows = cursor.fetchall()
-            if not rows:
-                break
-
-            for row in rows:
-                yield row["id"]
-
-            fetched += len(rows)
-            current_offset += len(rows)
+        # LIMIT NULL means no limit
+        cursor.execute(query, (limit, offset))
+        for row in cursor:
+            yield row[0]
     finally:
         cursor.close()
-        conn.close()
+        get_pool().putconn(conn)
 
 
 def rebuild_from_history(
@@ -130,19 +127,23 @@ def rebuild_from_history(
         List of processed game ids (for logging/verification).
     """
     processed: List[str] = []
-    for idx, game_id in enumerate(
-        stream_game_ids(limit=limit, offset=offset, batch_size=batch_size, include_failed=include_failed),
-        start=1,
-    ):
+    game_ids = stream_game_ids(limit=limit, offset=offset, batch_size=batch_size, include_failed=include_failed)
+    while True:
+        batch = list(islice(game_ids, batch_size))
+        if not batch:
+            break
+
         if dry_run:
-            print(f"[dry-run] Would process game {game_id}")
+            for game_id in batch:
+                print(f"[dry-run] Would process game {game_id}")
         else:
-            update_model_aggregates(game_id)
-            update_trueskill_ratings(game_id)
+            # Aggregates + TrueSkill for the whole batch: one read, one write
+            update_aggregates_and_trueskill_batch(batch)
 
-        processed.append(game_id)
-        if idx % 100 == 0:
-            print(f"Processed {idx} games...")
+        previous = len(processed)
+        processed.extend(batch)
+        if len(processed) // 100 > previous // 100:
+            print(f"Processed {len(processed)} games...")
 
     return processed
 
@@ -178,6 +179,9 @@ def main():
     )
     args = parser.parse_args()
 
+    if not args.dry_run:
+        ensure_replay_indexes()
+
     if not args.no_reset and not args.dry_run:
         count = reset_models_to_baseline()
         print(f"Reset {count} models to baseline ratings and zeroed aggregates.")
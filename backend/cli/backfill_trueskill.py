@@ -23,7 +23,7 @@ from services.trueskill_engine import (  # noqa: E402
     TrueSkillEngine,
     DEFAULT_MU,
     DEFAULT_SIGMA,
-    DISPLAY_MULTIPLIER,
+    BASELINE_DISPLAY_RATING,
 )
 
 
@@ -36,8 +36,6 @@ def reset_all_models() -> None:
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        exposed = DEFAULT_MU - 3 * DEFAULT_SIGMA
-        display = exposed * DISPLAY_MULTIPLIER
         cursor.execute(
             """
             UPDATE models
@@ -47,12 +45,12 @@ def reset_all_models() -> None:
                 elo_rating = %s,
                 updated_at = NOW()
             """,
-            (DEFAULT_MU, DEFAULT_SIGMA, display),
+            (DEFAULT_MU, DEFAULT_SIGMA, BASELINE_DISPLAY_RATING),
         )
         conn.commit()
         print(
             f"Reset {cursor.rowcount} models to mu={DEFAULT_MU}, sigma={DEFAULT_SIGMA}, "
-            f"exposed~{exposed:.3f} (elo/display alias {display:.1f})"
+            f"exposed~{DEFAULT_MU - 3 * DEFAULT_SIGMA:.3f} (elo/display alias {BASELINE_DISPLAY_RATING:.1f})"
         )
     finally:
         cursor.close()
@@ -21,7 +21,7 @@ Idempotent: if interrupted, rerun and it will pick up from history.
 import argparse
 import sys
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -35,6 +35,8 @@ from placement_system import (
     rebuild_state_from_history,
     get_ranked_models_by_index,
     get_opponent_rank_index,
+    build_rank_lookup,
+    build_opponent_context,
     format_state_summary,
     PlacementState,
 )
@@ -65,24 +67,27 @@ def fetch_candidates(conn, limit: int) -> List[Dict]:
     return cursor.fetchall()
 
 
-def has_pending_eval_game(conn, model_id: int) -> bool:
+def fetch_pending_eval_model_ids(conn, model_ids: List[int]) -> Set[int]:
     """
-    Check if the model already has a queued/in-progress evaluation game.
+    Return the subset of `model_ids` that already have a queued/in-progress
+    evaluation game, using a single query for the whole candidate batch.
     """
+    if not model_ids:
+        return set()
+
     cursor = conn.cursor()
     cursor.execute(
         """
-        SELECT 1
+        SELECT DISTINCT gp.model_id
         FROM games g
         JOIN game_participants gp ON gp.game_id = g.id
-        WHERE gp.model_id = %s
+        WHERE gp.model_id = ANY(%s)
           AND g.game_type = 'evaluation'
           AND g.status IN ('queued', 'in_progress')
-        LIMIT 1
         """,
-        (model_id,),
+        (list(model_ids),),
     )
-    return cursor.fetchone() is not None
+    return {row["model_id"] for row in cursor.fetchall()}
 
 
 def fetch_eval_history(conn, model_id: int) -> List[Dict]:
@@ -106,37 +111,22 @@ def fetch_eval_history(conn, model_id: int) -> List[Dict]:
             gp.score AS my_score,
             gp.death_reason AS my_death_reason,
             gp.death_round AS my_death_round,
-            (
-                SELECT opp.model_id
-                FROM game_participants opp
-                WHERE opp.game_id = g.id
-                  AND opp.model_id != gp.model_id
-                LIMIT 1
-            ) AS opponent_id,
-            (
-                SELECT opp.score
-                FROM game_participants opp
-                WHERE opp.game_id = g.id
-                  AND opp.model_id != gp.model_id
-                LIMIT 1
-            ) AS opponent_score,
-            (
-                SELECT opp.opponent_rank_at_match
-                FROM game_participants opp
-                WHERE opp.game_id = g.id
-                  AND opp.model_id != gp.model_id
-                LIMIT 1
-            ) AS opponent_rank_at_match,
-            (
-                SELECT m.trueskill_exposed
-                FROM game_participants opp
-                JOIN models m ON m.id = opp.model_id
-                WHERE opp.game_id = g.id
-                  AND opp.model_id != gp.model_id
-                LIMIT 1
-            ) AS opponent_rating
+            opp.model_id AS opponent_id,
+            opp.score AS opponent_score,
+            opp.opponent_rank_at_match,
+            opp.trueskill_exposed AS opponent_rating
         FROM games g
         JOIN game_participants gp ON gp.game_id = g.id
+        -- One lookup of the opponent row per game instead of four
+        -- correlated subqueries.
+        LEFT JOIN LATERAL (
+            SELECT o.model_id, o.score, o.opponent_rank_at_match, m.trueskill_exposed
+            FROM game_participants o
+            LEFT JOIN models m ON m.id = o.model_id
+            WHERE o.game_id = g.id
+              AND o.model_id != gp.model_id
+            LIMIT 1
+        ) opp ON TRUE
         WHERE gp.model_id = %s
           AND g.game_type = 'evaluation'
           AND g.status = 'completed'
@@ -147,21 +137,37 @@ def fetch_eval_history(conn, model_id: int) -> List[Dict]:
     return cursor.fetchall()
 
 
-def mark_status(conn, model_id: int, status: str) -> None:
+def mark_statuses(conn, updates: List[Tuple[int, str]]) -> None:
+    """
+    Apply (model_id, test_status) updates in one statement and one commit.
+    """
+    if not updates:
+        return
     cursor = conn.cursor()
     cursor.execute(
-        "UPDATE models SET test_status = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-        (status, model_id),
+        """
+        UPDATE models m
+        SET test_status = v.status, updated_at = CURRENT_TIMESTAMP
+        FROM unnest(%s::int[], %s::text[]) AS v(id, status)
+        WHERE m.id = v.id
+        """,
+        ([model_id for model_id, _ in updates], [status for _, status in updates]),
     )
     conn.commit()
 
 
-def finalize_model(conn, model_id: int, model_name: str, state: PlacementState) -> None:
-    """Finalize model and print summary."""
-    mark_status(conn, model_id, "ranked")
-    print(f"Finalized: {model_name}")
-    print(f"  Final rating: mu={state.mu:.1f} sigma={state.sigma:.1f} exposed={state.exposed:.1f}")
-    print(f"  Win-loss-tie from {state.games_played} games")
+def finalize_model(
+    status_updates: List[Tuple[int, str]],
+    model_id: int,
+    model_name: str,
+    state: PlacementState,
+    printer=print,
+) -> None:
+    """Queue the model's move to 'ranked' and print summary."""
+    status_updates.append((model_id, "ranked"))
+    printer(f"Finalized: {model_name}")
+    printer(f"  Final rating: mu={state.mu:.1f} sigma={state.sigma:.1f} exposed={state.exposed:.1f}")
+    printer(f"  Win-loss-tie from {state.games_played} games")
 
 
 def dispatch_eval_game(
@@ -226,21 +232,32 @@ def run_evaluation_batch(
         "no_candidates": False,
     }
 
+    # (model_id, test_status) changes, written together when the sweep ends
+    status_updates: List[Tuple[int, str]] = []
+
     conn = get_connection()
     try:
-        ranked_models = get_ranked_models_by_index()
+        # Reuse the batch connection for every placement lookup in this sweep
+        ranked_models = get_ranked_models_by_index(conn=conn)
         ranked_count = len(ranked_models)
         if ranked_count == 0:
             stats["no_ranked"] = True
             printer("No ranked models available to compare against. Aborting.")
             return stats
 
+        rank_lookup = build_rank_lookup(ranked_models)
+        # The leaderboard is fixed for the sweep; prepare opponent inputs once
+        opponent_context = build_opponent_context(ranked_models)
+
         candidates = fetch_candidates(conn, max_models)
         if not candidates:
             stats["no_candidates"] = True
             printer("No untested/testing models found.")
             return stats
 
+        # One query for in-flight evaluation games across all candidates
+        pending_ids = fetch_pending_eval_model_ids(conn, [c["id"] for c in candidates])
+
         game_params = {
             "width": width,
             "height": height,
@@ -263,7 +280,8 @@ def run_evaluation_batch(
                 model_id,
                 max_games=max_games,
                 history=history,
-                ranked_models=ranked_models
+                ranked_models=ranked_models,
+                conn=conn,
             )
 
             # Print state summary
@@ -271,13 +289,12 @@ def run_evaluation_batch(
 
             # Check if evaluation is complete (always check, even with pending games)
             if completed >= max_games:
-                finalize_model(conn, model_id, model_name, state)
+                finalize_model(status_updates, model_id, model_name, state, printer)
                 stats["finalized"].append(model_name)
                 continue
 
             # Check for pending games before enqueuing more
-            pending = has_pending_eval_game(conn, model_id)
-            if pending:
+            if model_id in pending_ids:
                 printer("  Pending evaluation game in progress; skipping enqueue.")
                 stats["pending_skipped"].append(model_name)
                 continue
@@ -291,11 +308,11 @@ def run_evaluation_batch(
 
             # Select next opponent using information gain
             opponent, debug = select_next_opponent_with_reason(
-                state, ranked_models=ranked_models, model_pricing=model_pricing
+                state, model_pricing=model_pricing, context=opponent_context
             )
             if not opponent:
                 printer("  No suitable opponent found; finalizing.")
-                finalize_model(conn, model_id, model_name, state)
+                finalize_model(status_updates, model_id, model_name, state, printer)
                 stats["finalized"].append(model_name)
                 continue
 
@@ -338,7 +355,7 @@ def run_evaluation_batch(
             )
 
             # Get model's current rank (None for untested/testing models)
-            model_rank_index = get_opponent_rank_index(model_id, ranked_models=ranked_models)
+            model_rank_index = get_opponent_rank_index(model_id, rank_lookup=rank_lookup)
 
             try:
                 task_id = dispatch_eval_game(
@@ -365,11 +382,20 @@ def run_evaluation_batch(
                 continue
 
             if status == "untested":
-                mark_status(conn, model_id, "testing")
+                status_updates.append((model_id, "testing"))
 
         return stats
     finally:
-        conn.close()
+        # Status transitions from the whole sweep land in one write, also when
+        # a later candidate raised: games already dispatched and models
+        # already finalized must be recorded or the next sweep redoes them.
+        try:
+            if status_updates:
+                # Clear a transaction aborted by the failure, if any
+                conn.rollback()
+                mark_statuses(conn, status_updates)
+        finally:
+            conn.close()
 
 
 def main():
@@ -8,32 +8,51 @@ pass baseline filters; otherwise they remain inactive and await evaluation.
 
 Usage:
     python backend/cli/sync_openrouter_models.py [--api-key <key>]
+    python backend/cli/sync_openrouter_models.py --enqueue   # run on a Celery worker
 """
 
 import os
 import sys
-import json
+import math
 import argparse
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
 
 # Add parent directory to path to import database modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from database_postgres import get_connection
+from data_access.cache import invalidate_models_cache
+from database_postgres import ensure_model_slug_index, get_connection
 from services.webhook_service import send_new_model_webhook
+from utils.utils import json_dumps, json_loads
 
+# Upper bound on concurrent new-model webhook POSTs after a sync.
+WEBHOOK_WORKERS = 16
 
-def fetch_openrouter_models(api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+# Cache validators from the last successfully applied catalog. The cron
+# service runs sync_models in a long-lived process, so later syncs can ask
+# for a conditional GET and skip parsing and DB work on a 304.
+_catalog_validators: Dict[str, str] = {}
+
+# Keep-alive session reused across syncs in the same process.
+_http = requests.Session()
+
+def fetch_openrouter_models(
+    api_key: Optional[str] = None,
+    validators: Optional[Dict[str, str]] = None,
+) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, str]]:
     """
     Fetch all models from OpenRouter API.
 
     Args:
         api_key: OpenRouter API key (optional, but recommended)
+        validators: ETag/Last-Modified values from a previous fetch; sent as
+            If-None-Match/If-Modified-Since so an unchanged catalog is a 304
 
     Returns:
-        List of model dictionaries from OpenRouter
+        (models, validators) — models is None when the server reports the
+        catalog unchanged; validators are the cache headers of this response
 
     Raises:
         requests.RequestException: If API call fails
@@ -44,23 +63,54 @@ def fetch_openrouter_models(api_key: Optional[str] = None) -> List[Dict[str, Any
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
 
+    validators = validators or {}
+    if validators.get('etag'):
+        headers["If-None-Match"] = validators['etag']
+    if validators.get('last_modified'):
+        headers["If-Modified-Since"] = validators['last_modified']
+
     print(f"Fetching models from OpenRouter API...")
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        # Stream the body and hand the raw bytes straight to the decoder so
+        # the catalog is not buffered a second time as text.
+        with _http.get(url, headers=headers, timeout=30, stream=True) as response:
+            if response.status_code == 304:
+                print("OpenRouter catalog not modified since last sync")
+                return None, validators
+
+            response.raise_for_status()
+            data = json_loads(response.raw.read(decode_content=True))
+            new_validators = {
+                key: value
+                for key, value in (
+                    ('etag', response.headers.get('ETag')),
+                    ('last_modified', response.headers.get('Last-Modified')),
+                )
+                if value
+            }
 
-        data = response.json()
         models = data.get('data', [])
 
         print(f"Fetched {len(models)} models from OpenRouter")
-        return models
+        return models, new_validators
 
     except requests.RequestException as e:
         print(f"Error fetching models from OpenRouter: {e}")
         raise
 
 
+def _per_million(price: Any) -> Optional[float]:
+    """
+    Convert an OpenRouter per-token price to dollars per million tokens.
+
+    Prices are a BigNumberUnion (number or numeric string); float() accepts
+    both, so no type check is needed. Missing and zero prices map to None.
+    """
+    price = float(price or 0)
+    return price * 1_000_000 if price else None
+
+
 def normalize_model_data(openrouter_model: Dict[str, Any]) -> Dict[str, Any]:
     """
     Normalize OpenRouter model data to our database schema.
@@ -71,45 +121,39 @@ def normalize_model_data(openrouter_model: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary with normalized fields for database insertion
     """
+    # Bound once; normalize runs for every entry in the catalog
+    get = openrouter_model.get
+
     # Extract pricing (OpenRouter uses per-token pricing)
-    pricing = openrouter_model.get('pricing', {})
+    pricing = get('pricing', {})
 
     # Convert to per-million tokens (OpenRouter may use different units)
     # OpenRouter pricing is typically in dollars per token, multiply by 1M
-    prompt_price = pricing.get('prompt')
-    completion_price = pricing.get('completion')
-
-    # Handle BigNumberUnion (can be number or string)
-    if isinstance(prompt_price, str):
-        prompt_price = float(prompt_price)
-    if isinstance(completion_price, str):
-        completion_price = float(completion_price)
-
-    # Convert to per-million if needed (OpenRouter uses per-token)
-    pricing_input = prompt_price * 1_000_000 if prompt_price else None
-    pricing_output = completion_price * 1_000_000 if completion_price else None
+    pricing_input = _per_million(pricing.get('prompt'))
+    pricing_output = _per_million(pricing.get('completion'))
 
     # Extract other fields
-    model_id = openrouter_model.get('id', '')
-    name = openrouter_model.get('name', model_id)
+    model_id = get('id', '')
+    name = get('name', model_id)
 
     # Derive provider from model ID (format is usually "provider/model-name")
-    provider = model_id.split('/')[0] if '/' in model_id else 'unknown'
+    head, sep, _ = model_id.partition('/')
+    provider = head if sep else 'unknown'
 
     # Get context length and max completion tokens
-    context_length = openrouter_model.get('context_length')
-    top_provider = openrouter_model.get('top_provider', {})
+    context_length = get('context_length')
+    top_provider = get('top_provider', {})
     max_completion_tokens = top_provider.get('max_completion_tokens', context_length)
 
-    # Store additional metadata as JSON
+    # Additional metadata stored in metadata_json
     metadata = {
-        'canonical_slug': openrouter_model.get('canonical_slug'),
-        'description': openrouter_model.get('description', ''),
-        'architecture': openrouter_model.get('architecture', {}),
+        'canonical_slug': get('canonical_slug'),
+        'description': get('description', ''),
+        'architecture': get('architecture', {}),
         'context_length': context_length,
-        'supported_parameters': openrouter_model.get('supported_parameters', []),
-        'created': openrouter_model.get('created'),
-        'hugging_face_id': openrouter_model.get('hugging_face_id'),
+        'supported_parameters': get('supported_parameters', []),
+        'created': get('created'),
+        'hugging_face_id': get('hugging_face_id'),
     }
 
     return {
@@ -119,118 +163,176 @@ def normalize_model_data(openrouter_model: Dict[str, Any]) -> Dict[str, Any]:
         'pricing_input': pricing_input,
         'pricing_output': pricing_output,
         'max_completion_tokens': max_completion_tokens,
-        'metadata_json': json.dumps(metadata)
+        # Serialized together with the rest of the batch in upsert_models
+        'metadata_json': metadata
     }
 
 
-def upsert_model(model_data: Dict[str, Any]) -> Tuple[Optional[int], bool]:
+def validate_model_data(model_data: Dict[str, Any]) -> Optional[str]:
     """
-    Insert or update a model in the database.
+    Check a normalized model against the models column types.
 
-    Args:
-        model_data: Normalized model data
+    The upsert writes the whole catalog in one transaction, so a row the
+    database would reject has to be caught here rather than rolling back
+    every other model with it. Integral float token limits are coerced to
+    int in place.
 
     Returns:
-        (Model ID if successful, is_new flag) — ID is None on failure/skip
+        Reason the row is rejected, or None if it can be written
     """
-    # Skip Auto Router entirely
-    if model_data.get('name') == 'Auto Router':
-        print(f"  Skipped: Auto Router (excluded from sync)")
-        return None, False
-
-    def qualifies_for_auto_activation(data: Dict[str, Any]) -> bool:
-        """Decide if a brand-new model should start as active."""
-        max_tokens = data.get('max_completion_tokens')
-        price_in = data.get('pricing_input')
-
-        return (
-            max_tokens is not None and max_tokens >= 5000
-            and price_in is not None and 0 < price_in <= 11
-        )
+    slug = model_data.get('model_slug')
+    if not isinstance(slug, str) or not slug:
+        return "missing model id"
+
+    name = model_data.get('name')
+    if not isinstance(name, str) or not name:
+        return f"{slug}: missing name"
+
+    max_tokens = model_data.get('max_completion_tokens')
+    if isinstance(max_tokens, float) and max_tokens.is_integer():
+        model_data['max_completion_tokens'] = max_tokens = int(max_tokens)
+    if max_tokens is not None and (isinstance(max_tokens, bool) or not isinstance(max_tokens, int)):
+        return f"{slug}: max_completion_tokens is not an integer ({max_tokens!r})"
+
+    for field in ('pricing_input', 'pricing_output'):
+        price = model_data.get(field)
+        if price is not None and not math.isfinite(price):
+            return f"{slug}: {field} is not a finite number ({price!r})"
+
+    return None
+
+
+def _qualifies_for_auto_activation(
+    max_tokens: Optional[int], price_in: Optional[float]
+) -> bool:
+    """Decide if a brand-new model should start as active."""
+    return (
+        max_tokens is not None and max_tokens >= 5000
+        and price_in is not None and 0 < price_in <= 11
+    )
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    is_new = False
 
-    try:
-        # Check if model already exists
-        cursor.execute("""
-            SELECT id, is_active, test_status, games_played
-            FROM models
-            WHERE model_slug = %s
-        """, (model_data['model_slug'],))
-
-        existing = cursor.fetchone()
-
-        if existing:
-            model_id = existing['id']
-            is_active = existing['is_active']
-            test_status = existing['test_status']
-            games_played = existing['games_played']
-
-            # Update pricing and metadata only, preserve status and stats
-            cursor.execute("""
-                UPDATE models
-                SET name = %s,
-                    provider = %s,
-                    pricing_input = %s,
-                    pricing_output = %s,
-                    max_completion_tokens = %s,
-                    metadata_json = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """, (
-                model_data['name'],
-                model_data['provider'],
-                model_data['pricing_input'],
-                model_data['pricing_output'],
-                model_data['max_completion_tokens'],
-                model_data['metadata_json'],
-                model_id
-            ))
-
-            print(f"  ↻ Updated: {model_data['name']} (already has {games_played} games)")
-        else:
-            # Insert new model; auto-activate if it meets baseline filters
-            is_active_default = qualifies_for_auto_activation(model_data)
-            cursor.execute("""
-                INSERT INTO models (
-                    name, provider, model_slug,
-                    pricing_input, pricing_output,
-                    max_completion_tokens, metadata_json,
-                    is_active, test_status,
-                    discovered_at
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'untested', %s)
-                RETURNING id
-            """, (
-                model_data['name'],
-                model_data['provider'],
-                model_data['model_slug'],
-                model_data['pricing_input'],
-                model_data['pricing_output'],
-                model_data['max_completion_tokens'],
-                model_data['metadata_json'],
-                is_active_default,
-                datetime.now().isoformat()
-            ))
-
-            result = cursor.fetchone()
-            model_id = result['id'] if result else None
-            is_new = True
-            status_note = "auto-activated" if is_active_default else "inactive"
-            print(f"  + Added: {model_data['name']} (new, untested, {status_note})")
+# Batch statements. Rows are shipped as one JSON array and expanded with
+# jsonb_populate_recordset(NULL::models, ...), so every field arrives typed
+# exactly like its models column and the IS DISTINCT FROM guard compares
+# like with like.
+_SELECT_EXISTING_SQL = """
+    SELECT id, model_slug, games_played
+    FROM models
+    WHERE model_slug = ANY(%s)
+"""
 
-        conn.commit()
-        return model_id, is_new
+# Update pricing and metadata only, preserve status and stats. Rows whose
+# synced columns are unchanged are filtered out, so a steady-state sync
+# writes no new row versions.
+_UPDATE_EXISTING_SQL = """
+    UPDATE models m
+    SET name = v.name,
+        provider = v.provider,
+        pricing_input = v.pricing_input,
+        pricing_output = v.pricing_output,
+        max_completion_tokens = v.max_completion_tokens,
+        metadata_json = v.metadata_json,
+        updated_at = CURRENT_TIMESTAMP
+    FROM jsonb_populate_recordset(NULL::models, %s::jsonb) v
+    WHERE m.model_slug = v.model_slug
+      AND (
+          (m.name, m.provider, m.pricing_input, m.pricing_output,
+           m.max_completion_tokens)
+              IS DISTINCT FROM
+          (v.name, v.provider, v.pricing_input, v.pricing_output,
+           v.max_completion_tokens)
+          OR m.metadata_json::jsonb IS DISTINCT FROM v.metadata_json::jsonb
+      )
+    RETURNING m.model_slug
+"""
 
-    except Exception as e:
-        print(f"  Error upserting model {model_data.get('name')}: {e}")
-        conn.rollback()
-        return None, False
+_INSERT_NEW_SQL = """
+    INSERT INTO models (
+        name, provider, model_slug,
+        pricing_input, pricing_output,
+        max_completion_tokens, metadata_json,
+        is_active, test_status,
+        discovered_at
+    )
+    SELECT v.name, v.provider, v.model_slug,
+           v.pricing_input, v.pricing_output,
+           v.max_completion_tokens, v.metadata_json,
+           v.is_active, 'untested',
+           CURRENT_TIMESTAMP
+    FROM jsonb_populate_recordset(NULL::models, %s::jsonb) v
+    RETURNING id, model_slug
+"""
 
-    finally:
-        conn.close()
+
+def upsert_models(models: List[Dict[str, Any]], cursor) -> Dict[str, Tuple[Optional[int], str]]:
+    """
+    Insert or update a batch of normalized models in three statements.
+
+    Existing slugs are read in one query, then changed rows are updated and
+    new rows inserted as one batch each. Runs inside the caller's
+    transaction, so the batch is all-or-nothing: a row the database rejects
+    fails every statement it is part of. Callers should drop rows that fail
+    validate_model_data first.
+
+    Args:
+        models: Normalized model data (see normalize_model_data)
+        cursor: Cursor on the sync connection
+
+    Returns:
+        Mapping of model_slug -> (model ID, status), where status is one of
+        'added', 'updated', 'unchanged' or 'skipped' (ID is None when skipped)
+    """
+    results: Dict[str, Tuple[Optional[int], str]] = {}
+    by_slug: Dict[str, Dict[str, Any]] = {}
+
+    for model_data in models:
+        # Skip Auto Router entirely
+        if model_data.get('name') == 'Auto Router':
+            print(f"  Skipped: Auto Router (excluded from sync)")
+            results[model_data['model_slug']] = (None, 'skipped')
+            continue
+        by_slug[model_data['model_slug']] = model_data
+
+    if not by_slug:
+        return results
+
+    cursor.execute(_SELECT_EXISTING_SQL, (list(by_slug),))
+    existing = {row['model_slug']: row for row in cursor.fetchall()}
+
+    to_update = [m for slug, m in by_slug.items() if slug in existing]
+    to_insert = [m for slug, m in by_slug.items() if slug not in existing]
+
+    if to_update:
+        cursor.execute(_UPDATE_EXISTING_SQL, (json_dumps(to_update),))
+        changed = {row['model_slug'] for row in cursor.fetchall()}
+
+        for model_data in to_update:
+            slug = model_data['model_slug']
+            row = existing[slug]
+            if slug in changed:
+                results[slug] = (row['id'], 'updated')
+                print(f"  ↻ Updated: {model_data['name']} (already has {row['games_played']} games)")
+            else:
+                results[slug] = (row['id'], 'unchanged')
+
+    if to_insert:
+        # Insert new models; auto-activate those that meet baseline filters
+        for model_data in to_insert:
+            model_data['is_active'] = _qualifies_for_auto_activation(
+                model_data['max_completion_tokens'], model_data['pricing_input']
+            )
+
+        cursor.execute(_INSERT_NEW_SQL, (json_dumps(to_insert),))
+        inserted = {row['model_slug']: row['id'] for row in cursor.fetchall()}
+
+        for model_data in to_insert:
+            slug = model_data['model_slug']
+            results[slug] = (inserted.get(slug), 'added')
+            status_note = "auto-activated" if model_data['is_active'] else "inactive"
+            print(f"  + Added: {model_data['name']} (new, untested, {status_note})")
+
+    return results
 
 
 def sync_models(api_key: Optional[str] = None) -> Dict[str, int]:
@@ -249,48 +351,106 @@ def sync_models(api_key: Optional[str] = None) -> Dict[str, int]:
 
     # Fetch models from OpenRouter
     try:
-        openrouter_models = fetch_openrouter_models(api_key)
+        openrouter_models, validators = fetch_openrouter_models(
+            api_key, _catalog_validators
+        )
     except Exception as e:
         print(f"Failed to fetch models: {e}")
         return {'error': 1}
 
+    if openrouter_models is None:
+        return {'total': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'errors': 0}
+
     # Process each model
     stats = {
         'total': len(openrouter_models),
         'added': 0,
         'updated': 0,
-        'skipped': 0
+        'unchanged': 0,
+        'skipped': 0,
+        'errors': 0
     }
 
     print(f"\nProcessing {stats['total']} models...")
 
+    # New models are collected here and announced after the DB loop so the
+    # webhook round trips don't serialize the sync.
+    new_models: List[Dict[str, Any]] = []
+
+    ensure_model_slug_index()
+
+    # Keyed by slug so a slug repeated in the catalog is written once (the
+    # last entry wins); upsert_models could not update one row twice.
+    normalized_by_slug: Dict[str, Dict[str, Any]] = {}
     for or_model in openrouter_models:
         try:
-            # Normalize and upsert
             normalized = normalize_model_data(or_model)
-            model_id, is_new = upsert_model(normalized)
+        except Exception as e:
+            print(f"  Error processing model: {e}")
+            stats['skipped'] += 1
+            continue
+
+        problem = validate_model_data(normalized)
+        if problem:
+            print(f"  Rejected: {problem}")
+            stats['errors'] += 1
+            continue
+
+        slug = normalized['model_slug']
+        if slug in normalized_by_slug:
+            print(f"  Duplicate: {slug} (keeping the later entry)")
+            stats['skipped'] += 1
+        normalized_by_slug[slug] = normalized
+    normalized_models = list(normalized_by_slug.values())
+
+    # One connection and one transaction for the whole catalog; the upsert
+    # is three set-based statements regardless of catalog size. Rows were
+    # validated above, so only a database-level failure rolls the sync back.
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        results = upsert_models(normalized_models, cursor)
+
+        for normalized in normalized_models:
+            model_id, status = results.get(normalized['model_slug'], (None, 'skipped'))
 
             if model_id is None:
                 stats['skipped'] += 1
                 continue
 
-            if is_new:
-                stats['added'] += 1
-                send_new_model_webhook(
-                    model_id=model_id,
-                    name=normalized['name'],
-                    provider=normalized['provider'],
-                    model_slug=normalized['model_slug'],
-                    pricing_input=normalized.get('pricing_input'),
-                    pricing_output=normalized.get('pricing_output'),
-                    max_completion_tokens=normalized.get('max_completion_tokens'),
-                )
-            else:
-                stats['updated'] += 1
+            stats[status] += 1
+            if status == 'added':
+                new_models.append({
+                    'model_id': model_id,
+                    'name': normalized['name'],
+                    'provider': normalized['provider'],
+                    'model_slug': normalized['model_slug'],
+                    'pricing_input': normalized.get('pricing_input'),
+                    'pricing_output': normalized.get('pricing_output'),
+                    'max_completion_tokens': normalized.get('max_completion_tokens'),
+                })
 
-        except Exception as e:
-            print(f"  Error processing model: {e}")
-            stats['skipped'] += 1
+        conn.commit()
+        invalidate_models_cache()
+
+        # Only remember the validators once the catalog they describe is
+        # committed; otherwise a failed sync would be skipped next time.
+        _catalog_validators.clear()
+        _catalog_validators.update(validators)
+
+    except Exception as e:
+        print(f"Sync failed, rolling back: {e}")
+        conn.rollback()
+        return {'error': 1}
+
+    finally:
+        conn.close()
+
+    if new_models:
+        workers = min(WEBHOOK_WORKERS, len(new_models))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda m: send_new_model_webhook(**m), new_models))
 
     # Print summary
     print(f"\n{'=' * 70}")
@@ -299,7 +459,9 @@ def sync_models(api_key: Optional[str] = None) -> Dict[str, int]:
     print(f"Total models processed: {stats['total']}")
     print(f"New models added: {stats['added']}")
     print(f"Existing models updated: {stats['updated']}")
+    print(f"Existing models unchanged: {stats['unchanged']}")
     print(f"Models skipped: {stats['skipped']}")
+    print(f"Models rejected: {stats['errors']}")
 
     print(f"{'=' * 70}\n")
 
@@ -315,9 +477,22 @@ def main():
         type=str,
         help="OpenRouter API key (or set OPENROUTER_API_KEY env var)"
     )
+    parser.add_argument(
+        '--enqueue',
+        action='store_true',
+        help="Queue the sync on a running Celery worker instead of running it here"
+    )
 
     args = parser.parse_args()
 
+    if args.enqueue:
+        # Only the lightweight Celery app is needed to publish the task; the
+        # worker already has the sync stack imported and uses its own API key.
+        from celery_app import app as celery_app
+        result = celery_app.send_task('backend.tasks.sync_openrouter_models_task')
+        print(f"Enqueued OpenRouter sync as task {result.id}")
+        return
+
     # Get API key from args or environment
     api_key = args.api_key or os.getenv('OPENROUTER_API_KEY')
 
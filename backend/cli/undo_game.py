@@ -3,49 +3,57 @@
 Undo a game with two modes:
 
 1) Fast path (default): delete the game + participants and recompute aggregates from remaining games.
-   TrueSkill ratings are left as-is (so they're technically stale) and you can optionally
-   run a full backfill later.
+   If model_rating_history shows the game is still each participant's latest rated game, their
+   pre-game TrueSkill ratings are restored; otherwise ratings are left as-is (so they're
+   technically stale) and you can optionally run a full backfill later.
 2) Full rebuild: reset all models and replay every game except the target (expensive, previous default).
 """
 
 import argparse
 import os
 import sys
-from typing import Iterable, List
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
 
+import psycopg2.extensions
 from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+from trueskill import Rating
 
 # Add backend to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from database_postgres import get_connection  # noqa: E402
-from data_access import (  # noqa: E402
-    update_model_aggregates,
-    update_trueskill_ratings,
+from database_postgres import (  # noqa: E402
+    ensure_game_participants_game_id_index,
+    ensure_replay_indexes,
+    get_pool,
 )
 from services.trueskill_engine import (  # noqa: E402
     DEFAULT_MU,
     DEFAULT_SIGMA,
-    DISPLAY_MULTIPLIER,
+    BASELINE_DISPLAY_RATING,
+    trueskill_engine,
 )
 
 
-def reset_models_and_stats() -> int:
+def reset_models_and_stats(conn) -> int:
     """
-    Reset TrueSkill fields and aggregate stats to baseline. Returns number of rows updated.
+    Reset TrueSkill fields and aggregate stats to baseline. Rows already at
+    baseline are skipped, so the returned count is the number actually changed.
+
+    Runs in the caller's transaction; nothing is committed here.
     """
-    conn = get_connection()
     cursor = conn.cursor()
     try:
-        exposed = DEFAULT_MU - 3 * DEFAULT_SIGMA
-        display = exposed * DISPLAY_MULTIPLIER
         cursor.execute(
             """
             UPDATE models
-            SET trueskill_mu = %s,
-                trueskill_sigma = %s,
+            SET trueskill_mu = %(mu)s,
+                trueskill_sigma = %(sigma)s,
                 trueskill_updated_at = NOW(),
-                elo_rating = %s,
+                elo_rating = %(display)s,
                 wins = 0,
                 losses = 0,
                 ties = 0,
@@ -53,22 +61,31 @@ def reset_models_and_stats() -> int:
                 games_played = 0,
                 last_played_at = NULL,
                 updated_at = NOW()
+            WHERE trueskill_mu IS DISTINCT FROM %(mu)s
+               OR trueskill_sigma IS DISTINCT FROM %(sigma)s
+               OR elo_rating IS DISTINCT FROM %(display)s
+               OR wins IS DISTINCT FROM 0
+               OR losses IS DISTINCT FROM 0
+               OR ties IS DISTINCT FROM 0
+               OR apples_eaten IS DISTINCT FROM 0
+               OR games_played IS DISTINCT FROM 0
+               OR last_played_at IS NOT NULL
             """,
-            (DEFAULT_MU, DEFAULT_SIGMA, display),
+            {"mu": DEFAULT_MU, "sigma": DEFAULT_SIGMA, "display": BASELINE_DISPLAY_RATING},
         )
-        conn.commit()
         return cursor.rowcount
     finally:
         cursor.close()
-        conn.close()
 
 
-def recompute_aggregates_all_models() -> None:
+def recompute_aggregates_all_models(conn) -> None:
     """
     Recompute aggregate stats (wins/losses/ties/apples/games_played/last_played_at)
     from remaining games without touching TrueSkill ratings.
+
+    One UPDATE covers every model; models left without games have no agg row
+    and fall through the COALESCEs to zero.
     """
-    conn = get_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -94,94 +111,255 @@ def recompute_aggregates_all_models() -> None:
                 games_played = COALESCE(a.games_played, 0),
                 last_played_at = a.last_played_at,
                 updated_at = NOW()
-            FROM agg a
-            WHERE m.id = a.model_id
+            FROM models m2
+            LEFT JOIN agg a ON a.model_id = m2.id
+            WHERE m.id = m2.id
             """
         )
-
-        # Reset models that no longer have any games
-        cursor.execute(
-            """
-            UPDATE models m
-            SET wins = 0,
-                losses = 0,
-                ties = 0,
-                apples_eaten = 0,
-                games_played = 0,
-                last_played_at = NULL,
-                updated_at = NOW()
-            WHERE NOT EXISTS (
-                SELECT 1 FROM game_participants gp WHERE gp.model_id = m.id
-            )
-            """
-        )
-        conn.commit()
     finally:
         cursor.close()
-        conn.close()
 
 
-def stream_game_ids(exclude_game_id: str) -> Iterable[str]:
+def stream_replay_games(
+    conn, exclude_game_id: str
+) -> Iterator[Tuple[str, Any, List[Tuple[int, str, int]]]]:
     """
-    Yield game ids in chronological order, excluding the target game.
+    Yield (game_id, start_time, participants) in chronological order, excluding
+    the target game. Participants are (model_id, result, score) in slot order.
+
+    Every game's participants come from one JOINed query, streamed through a
+    server-side cursor and regrouped per game, instead of one participant
+    lookup per game. The stream uses a plain tuple cursor: it can cover the
+    whole participants table, and a dict per row is pure overhead here.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    cursor = conn.cursor(name="undo_replay_stream", cursor_factory=psycopg2.extensions.cursor)
+    cursor.itersize = 10000
     try:
         cursor.execute(
             """
-            SELECT id
-            FROM games
-            WHERE id <> %s
-            ORDER BY start_time ASC NULLS FIRST, end_time ASC NULLS FIRST, id ASC
+            SELECT g.id, g.start_time, gp.model_id, gp.result, gp.score
+            FROM games g
+            LEFT JOIN (
+                game_participants gp JOIN models m ON m.id = gp.model_id
+            ) ON gp.game_id = g.id
+            WHERE g.id <> %s
+            ORDER BY g.start_time ASC NULLS FIRST, g.end_time ASC NULLS FIRST, g.id ASC,
+                     gp.player_slot ASC
             """,
             (exclude_game_id,),
         )
-        for row in cursor.fetchall():
-            yield row["id"]
+        for game_id, rows in groupby(cursor, key=itemgetter(0)):
+            rows = list(rows)
+            yield game_id, rows[0][1], [
+                (model_id, result, score)
+                for _, _, model_id, result, score in rows
+                if model_id is not None
+            ]
     finally:
         cursor.close()
-        conn.close()
 
 
-def game_exists(game_id: str) -> bool:
-    conn = get_connection()
+def game_exists(conn, game_id: str) -> bool:
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT 1 FROM games WHERE id = %s", (game_id,))
         return cursor.fetchone() is not None
     finally:
         cursor.close()
-        conn.close()
 
 
-def delete_game_and_participants(game_id: str) -> None:
-    conn = get_connection()
+def delete_game_and_participants(conn, game_id: str) -> bool:
+    """Delete the game and its participants. Returns False if the game does not exist."""
     cursor = conn.cursor()
     try:
-        cursor.execute("DELETE FROM game_participants WHERE game_id = %s", (game_id,))
-        cursor.execute("DELETE FROM games WHERE id = %s", (game_id,))
-        conn.commit()
+        # Both deletes in one round-trip; the FK check runs at statement end,
+        # after the participants are gone.
+        cursor.execute(
+            """
+            WITH deleted_participants AS (
+                DELETE FROM game_participants WHERE game_id = %s
+            )
+            DELETE FROM games WHERE id = %s
+            RETURNING id
+            """,
+            (game_id, game_id),
+        )
+        return cursor.rowcount > 0
     finally:
         cursor.close()
-        conn.close()
 
 
-def replay_all_but_target(target_game_id: str) -> List[str]:
+def revert_game_ratings(conn, game_id: str) -> bool:
+    """
+    Undo the game's TrueSkill update by restoring each participant's pre-game
+    rating from model_rating_history.
+
+    This is only sound while the game is every participant's latest rated
+    game, i.e. each stored rating still equals the recorded post-game rating;
+    otherwise later games were rated on top of it and only a full replay is
+    correct. Returns False, changing nothing, when the history table or the
+    game's rows are missing or stale.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT to_regclass('public.model_rating_history') AS reg")
+        row = cursor.fetchone()
+        if not row or not row["reg"]:
+            return False
+
+        cursor.execute(
+            """
+            SELECT gp.model_id,
+                   h.pre_mu,
+                   h.pre_sigma,
+                   COALESCE(
+                       m.trueskill_mu = h.post_mu AND m.trueskill_sigma = h.post_sigma,
+                       FALSE
+                   ) AS is_latest
+            FROM game_participants gp
+            JOIN models m ON m.id = gp.model_id
+            LEFT JOIN model_rating_history h
+                ON h.model_id = gp.model_id AND h.game_id = %s
+            WHERE gp.game_id = %s
+            """,
+            (game_id, game_id),
+        )
+        rows = cursor.fetchall()
+        if not rows or not all(r["is_latest"] for r in rows):
+            return False
+
+        execute_values(
+            cursor,
+            """
+            UPDATE models AS m
+            SET trueskill_mu = v.mu,
+                trueskill_sigma = v.sigma,
+                trueskill_updated_at = NOW(),
+                elo_rating = v.display,
+                updated_at = NOW()
+            FROM (VALUES %s) AS v(id, mu, sigma, display)
+            WHERE m.id = v.id
+            """,
+            [
+                (
+                    r["model_id"],
+                    r["pre_mu"],
+                    r["pre_sigma"],
+                    trueskill_engine.display_score(Rating(mu=r["pre_mu"], sigma=r["pre_sigma"])),
+                )
+                for r in rows
+            ],
+            template="(%s::int, %s::float8, %s::float8, %s::float8)",
+        )
+        cursor.execute("DELETE FROM model_rating_history WHERE game_id = %s", (game_id,))
+        return True
+    finally:
+        cursor.close()
+
+
+def _new_model_stats() -> Dict[str, Any]:
+    return {
+        "wins": 0,
+        "losses": 0,
+        "ties": 0,
+        "apples_eaten": 0,
+        "games_played": 0,
+        "last_played_at": None,
+    }
+
+
+def replay_all_but_target(conn, target_game_id: str) -> List[str]:
     """
     Reset state and replay all games except the target.
+
+    Ratings and aggregates are rebuilt in memory from a single streamed pass
+    over the game history and written back once at the end. Everything runs
+    in the caller's transaction, so a failure part-way leaves the leaderboard
+    untouched.
     Returns list of processed game ids.
     """
-    updated_models = reset_models_and_stats()
-    print(f"Reset {updated_models} models to baseline ratings and zeroed aggregates.")
+    baseline = trueskill_engine.env.Rating(mu=DEFAULT_MU, sigma=DEFAULT_SIGMA)
+    # Models start at the baseline the reset just wrote
+    ratings: Dict[int, Rating] = defaultdict(lambda: baseline)
+    stats: Dict[int, Dict[str, Any]] = defaultdict(_new_model_stats)
 
     processed: List[str] = []
-    for gid in stream_game_ids(target_game_id):
-        update_model_aggregates(gid)
-        update_trueskill_ratings(gid)
+    updated_models = reset_models_and_stats(conn)
+    print(f"Reset {updated_models} models to baseline ratings and zeroed aggregates.")
+
+    for gid, started, participants in stream_replay_games(conn, target_game_id):
+        for mid, result, score in participants:
+            model_stats = stats[mid]
+            if result == "won":
+                model_stats["wins"] += 1
+            elif result == "lost":
+                model_stats["losses"] += 1
+            elif result == "tied":
+                model_stats["ties"] += 1
+            model_stats["apples_eaten"] += score or 0
+            model_stats["games_played"] += 1
+            if started is not None and (
+                model_stats["last_played_at"] is None or started > model_stats["last_played_at"]
+            ):
+                model_stats["last_played_at"] = started
+
+        if len(participants) >= 2:
+            new_ratings = trueskill_engine.rate_results(
+                [ratings[mid] for mid, _, _ in participants],
+                [result for _, result, _ in participants],
+            )
+            for (mid, _, _), rating in zip(participants, new_ratings):
+                ratings[mid] = rating
+
         processed.append(gid)
         if len(processed) % 100 == 0:
             print(f"Replayed {len(processed)} games...")
+
+    rows = [
+        (
+            mid,
+            ratings[mid].mu,
+            ratings[mid].sigma,
+            trueskill_engine.display_score(ratings[mid]),
+            model_stats["wins"],
+            model_stats["losses"],
+            model_stats["ties"],
+            model_stats["apples_eaten"],
+            model_stats["games_played"],
+            model_stats["last_played_at"],
+        )
+        for mid, model_stats in stats.items()
+    ]
+    cursor = conn.cursor()
+    try:
+        # A replay is reproducible from the games table, so skip waiting
+        # on the WAL flush for this one bulk commit.
+        cursor.execute("SET LOCAL synchronous_commit = off")
+        # One statement for every touched model instead of one UPDATE each
+        execute_values(
+            cursor,
+            """
+            UPDATE models AS m
+            SET trueskill_mu = v.mu,
+                trueskill_sigma = v.sigma,
+                trueskill_updated_at = NOW(),
+                elo_rating = v.display,
+                wins = v.wins,
+                losses = v.losses,
+                ties = v.ties,
+                apples_eaten = v.apples,
+                games_played = v.games,
+                last_played_at = v.last_played,
+                updated_at = NOW()
+            FROM (VALUES %s) AS v(id, mu, sigma, display, wins, losses, ties, apples, games, last_played)
+            WHERE m.id = v.id
+            """,
+            rows,
+            template="(%s::int, %s::float8, %s::float8, %s::float8, %s::int, %s::int, %s::int, %s::int, %s::int, %s::timestamp)",
+            page_size=1000,
+        )
+    finally:
+        cursor.close()
     return processed
 
 
@@ -189,7 +367,8 @@ def main():
     load_dotenv()
 
     parser = argparse.ArgumentParser(
-        description="Undo a game. Default: delete + recompute aggregates only (TrueSkill left untouched). "
+        description="Undo a game. Default: delete + recompute aggregates, reverting TrueSkill from "
+                    "rating history when possible. "
                     "Use --replay-all to reset/replay everything except the target game."
     )
     parser.add_argument("game_id", help="The game id to undo (will be deleted unless --dry-run)")
@@ -205,33 +384,60 @@ def main():
     )
     args = parser.parse_args()
 
-    if not game_exists(args.game_id):
-        print(f"Game {args.game_id} not found.")
-        return
-
+    # Before borrowing conn: concurrent index builds wait on every open transaction
+    if not args.dry_run:
+        ensure_game_participants_game_id_index()
     if args.replay_all:
-        processed = replay_all_but_target(args.game_id)
-        print(f"Finished replaying {len(processed)} games (excluding {args.game_id}).")
+        ensure_replay_indexes()
 
-        if args.dry_run:
-            print("Dry run; target game not deleted.")
-            return
+    # One connection for the whole undo; `with conn` commits once on success
+    # and rolls everything back if any step fails.
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            # The fast path learns whether the game exists from its DELETE
+            if (args.replay_all or args.dry_run) and not game_exists(conn, args.game_id):
+                print(f"Game {args.game_id} not found.")
+                return
 
-        delete_game_and_participants(args.game_id)
-        print(f"Deleted game {args.game_id} and its participants.")
-        return
+            if args.replay_all:
+                processed = replay_all_but_target(conn, args.game_id)
+                print(f"Finished replaying {len(processed)} games (excluding {args.game_id}).")
 
-    # Fast path: delete and recompute aggregates only (no TrueSkill rebuild)
-    if args.dry_run:
-        print("Dry run; no changes made.")
-        return
+                if args.dry_run:
+                    print("Dry run; target game not deleted.")
+                    return
+
+                delete_game_and_participants(conn, args.game_id)
+                print(f"Deleted game {args.game_id} and its participants.")
+                return
+
+            # Fast path: delete and recompute aggregates only (no TrueSkill rebuild)
+            if args.dry_run:
+                print("Dry run; no changes made.")
+                return
 
-    delete_game_and_participants(args.game_id)
-    recompute_aggregates_all_models()
+            # Participants are needed to revert, so this runs before the delete
+            reverted = revert_game_ratings(conn, args.game_id)
+            if not delete_game_and_participants(conn, args.game_id):
+                print(f"Game {args.game_id} not found.")
+                return
+            recompute_aggregates_all_models(conn)
+    finally:
+        pool.putconn(conn)
+
+    if reverted:
+        print(
+            "Deleted game and participants. Recomputed aggregates from remaining games.\n"
+            "Restored participants' pre-game TrueSkill ratings from model_rating_history."
+        )
+        return
 
     print(
         "Deleted game and participants. Recomputed aggregates from remaining games.\n"
-        "TrueSkill ratings were NOT recomputed; run backfill_trueskill.py with --reset "
+        "TrueSkill ratings were NOT recomputed (no current rating history for this game); "
+        "rerun with --replay-all or run backfill_trueskill.py with --reset "
         "if you need fully consistent ratings."
     )
 
@@ -15,22 +15,33 @@ This is intentionally approximate; it avoids a full global replay.
 import argparse
 import os
 import sys
+from itertools import groupby, islice
+from operator import itemgetter
 from typing import Dict, Iterable, List, Set
 
+import psycopg2.extensions
 from dotenv import load_dotenv
+from trueskill import Rating
 
 # Add backend to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from database_postgres import get_connection  # noqa: E402
+from database_postgres import (  # noqa: E402
+    ensure_game_participants_game_id_index,
+    ensure_replay_indexes,
+    get_connection,
+)
 from services.trueskill_engine import (  # noqa: E402
     DEFAULT_MU,
     DEFAULT_SIGMA,
-    DISPLAY_MULTIPLIER,
+    BASELINE_DISPLAY_RATING,
     trueskill_engine,
 )
 from data_access.repositories.model_repository import ModelRepository  # noqa: E402
 
+# Game ids fetched per server-side cursor round trip, and replayed per batch
+REPLAY_BATCH_SIZE = 2000
+
 
 def fetch_model(conn, model_id: int) -> Dict:
     cursor = conn.cursor()
@@ -49,50 +60,29 @@ def fetch_model(conn, model_id: int) -> Dict:
 
 
 def fetch_games(conn, model_id: int, all_types: bool) -> List[Dict]:
-    cursor = conn.cursor()
-    try:
-        if all_types:
-            cursor.execute(
-                """
-                SELECT g.id, g.game_type, g.status, g.start_time
-                FROM games g
-                JOIN game_participants gp ON gp.game_id = g.id
-                WHERE gp.model_id = %s
-                ORDER BY g.start_time ASC NULLS FIRST, g.id ASC
-                """,
-                (model_id,),
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT g.id, g.game_type, g.status, g.start_time
-                FROM games g
-                JOIN game_participants gp ON gp.game_id = g.id
-                WHERE gp.model_id = %s
-                  AND g.game_type = 'evaluation'
-                ORDER BY g.start_time ASC NULLS FIRST, g.id ASC
-                """,
-                (model_id,),
-            )
-        return cursor.fetchall()
-    finally:
-        cursor.close()
-
-
-def collect_impacted_models(conn, game_ids: List[str]) -> Set[int]:
-    if not game_ids:
-        return set()
+    """
+    Fetch the model's games (chronological). Each row also carries `impacted`,
+    the ids of every model that played in that game, so the cohort comes out
+    of the same participants scan instead of a second query.
+    """
+    type_filter = "" if all_types else "AND g.game_type = 'evaluation'"
     cursor = conn.cursor()
     try:
         cursor.execute(
-            """
-            SELECT DISTINCT model_id
-            FROM game_participants
-            WHERE game_id = ANY(%s)
+            f"""
+            SELECT g.id, g.game_type, g.status, g.start_time,
+                   array_agg(DISTINCT gp_all.model_id) AS impacted
+            FROM games g
+            JOIN game_participants gp ON gp.game_id = g.id
+            JOIN game_participants gp_all ON gp_all.game_id = g.id
+            WHERE gp.model_id = %s
+              {type_filter}
+            GROUP BY g.id, g.game_type, g.status, g.start_time
+            ORDER BY g.start_time ASC NULLS FIRST, g.id ASC
             """,
-            (game_ids,),
+            (model_id,),
         )
-        return {row["model_id"] for row in cursor.fetchall()}
+        return cursor.fetchall()
     finally:
         cursor.close()
 
@@ -103,23 +93,29 @@ def delete_games(conn, game_ids: List[str]) -> Dict[str, int]:
 
     cursor = conn.cursor()
     try:
+        # Both deletes in one round-trip; the FK check runs at statement end,
+        # after the participants are gone.
         cursor.execute(
             """
-            DELETE FROM game_participants
-            WHERE game_id = ANY(%s)
-            """,
-            (game_ids,),
-        )
-        participants_deleted = cursor.rowcount or 0
-
-        cursor.execute(
-            """
-            DELETE FROM games
-            WHERE id = ANY(%s)
+            WITH deleted_participants AS (
+                DELETE FROM game_participants
+                WHERE game_id = ANY(%s)
+                RETURNING 1
+            ),
+            deleted_games AS (
+                DELETE FROM games
+                WHERE id = ANY(%s)
+                RETURNING 1
+            )
+            SELECT
+                (SELECT COUNT(*) FROM deleted_games) AS games_deleted,
+                (SELECT COUNT(*) FROM deleted_participants) AS participants_deleted
             """,
-            (game_ids,),
+            (game_ids, game_ids),
         )
-        games_deleted = cursor.rowcount or 0
+        counts = cursor.fetchone()
+        games_deleted = counts["games_deleted"]
+        participants_deleted = counts["participants_deleted"]
 
         conn.commit()
         return {
@@ -130,12 +126,31 @@ def delete_games(conn, game_ids: List[str]) -> Dict[str, int]:
         cursor.close()
 
 
+def set_model_status(conn, model_id: int, status: str) -> None:
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            UPDATE models
+            SET test_status = %s,
+                updated_at = NOW()
+            WHERE id = %s
+              AND test_status IS DISTINCT FROM %s
+            """,
+            (status, model_id, status),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
 def reset_models_to_baseline(
     conn, model_ids: Iterable[int], status_override: Dict[int, str] | None = None
 ) -> None:
     """
     Reset TrueSkill and aggregates for provided models to the baseline.
     Optionally override test_status per model (used for the target model).
+    Rows already in that state are left alone.
     """
     model_ids = list(model_ids)
     if not model_ids:
@@ -143,50 +158,82 @@ def reset_models_to_baseline(
 
     cursor = conn.cursor()
     try:
-        exposed = DEFAULT_MU - 3 * DEFAULT_SIGMA
-        display = exposed * DISPLAY_MULTIPLIER
-
-        for mid in model_ids:
-            status = (status_override or {}).get(mid)
-            if status:
-                cursor.execute(
-                    """
-                    UPDATE models
-                    SET trueskill_mu = %s,
-                        trueskill_sigma = %s,
-                        trueskill_updated_at = NOW(),
-                        elo_rating = %s,
-                        wins = 0,
-                        losses = 0,
-                        ties = 0,
-                        apples_eaten = 0,
-                        games_played = 0,
-                        last_played_at = NULL,
-                        test_status = %s,
-                        updated_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (DEFAULT_MU, DEFAULT_SIGMA, display, status, mid),
-                )
-            else:
-                cursor.execute(
-                    """
-                    UPDATE models
-                    SET trueskill_mu = %s,
-                        trueskill_sigma = %s,
-                        trueskill_updated_at = NOW(),
-                        elo_rating = %s,
-                        wins = 0,
-                        losses = 0,
-                        ties = 0,
-                        apples_eaten = 0,
-                        games_played = 0,
-                        last_played_at = NULL,
-                        updated_at = NOW()
-                    WHERE id = %s
-                    """,
-                    (DEFAULT_MU, DEFAULT_SIGMA, display, mid),
-                )
+        status_override = status_override or {}
+        overrides = [(mid, status_override[mid]) for mid in model_ids if status_override.get(mid)]
+        override_ids = {mid for mid, _ in overrides}
+        plain_ids = [mid for mid in model_ids if mid not in override_ids]
+
+        # Models without a status override share one UPDATE instead of one each
+        if plain_ids:
+            cursor.execute(
+                """
+                UPDATE models
+                SET trueskill_mu = %(mu)s,
+                    trueskill_sigma = %(sigma)s,
+                    trueskill_updated_at = NOW(),
+                    elo_rating = %(display)s,
+                    wins = 0,
+                    losses = 0,
+                    ties = 0,
+                    apples_eaten = 0,
+                    games_played = 0,
+                    last_played_at = NULL,
+                    updated_at = NOW()
+                WHERE id = ANY(%(ids)s)
+                  AND (trueskill_mu IS DISTINCT FROM %(mu)s
+                       OR trueskill_sigma IS DISTINCT FROM %(sigma)s
+                       OR elo_rating IS DISTINCT FROM %(display)s
+                       OR wins IS DISTINCT FROM 0
+                       OR losses IS DISTINCT FROM 0
+                       OR ties IS DISTINCT FROM 0
+                       OR apples_eaten IS DISTINCT FROM 0
+                       OR games_played IS DISTINCT FROM 0
+                       OR last_played_at IS NOT NULL)
+                """,
+                {
+                    "mu": DEFAULT_MU,
+                    "sigma": DEFAULT_SIGMA,
+                    "display": BASELINE_DISPLAY_RATING,
+                    "ids": plain_ids,
+                },
+            )
+        # Overrides only ever cover the target model, so these stay one-row
+        for mid, status in overrides:
+            cursor.execute(
+                """
+                UPDATE models
+                SET trueskill_mu = %(mu)s,
+                    trueskill_sigma = %(sigma)s,
+                    trueskill_updated_at = NOW(),
+                    elo_rating = %(display)s,
+                    wins = 0,
+                    losses = 0,
+                    ties = 0,
+                    apples_eaten = 0,
+                    games_played = 0,
+                    last_played_at = NULL,
+                    test_status = %(status)s,
+                    updated_at = NOW()
+                WHERE id = %(id)s
+                  AND (trueskill_mu IS DISTINCT FROM %(mu)s
+                       OR trueskill_sigma IS DISTINCT FROM %(sigma)s
+                       OR elo_rating IS DISTINCT FROM %(display)s
+                       OR wins IS DISTINCT FROM 0
+                       OR losses IS DISTINCT FROM 0
+                       OR ties IS DISTINCT FROM 0
+                       OR apples_eaten IS DISTINCT FROM 0
+                       OR games_played IS DISTINCT FROM 0
+                       OR last_played_at IS NOT NULL
+                       OR test_status IS DISTINCT FROM %(status)s)
+                """,
+                {
+                    "mu": DEFAULT_MU,
+                    "sigma": DEFAULT_SIGMA,
+                    "display": BASELINE_DISPLAY_RATING,
+                    "status": status,
+                    "id": mid,
+                },
+            )
         conn.commit()
     finally:
         cursor.close()
@@ -195,6 +242,8 @@ def reset_models_to_baseline(
 def recompute_aggregates_for_models(conn, model_ids: Iterable[int]) -> None:
     """
     Recompute aggregates for a subset of models from remaining games.
+
+    Models left without games have no agg row and are zeroed by the COALESCEs.
     """
     model_ids = list(model_ids)
     if not model_ids:
@@ -226,28 +275,12 @@ def recompute_aggregates_for_models(conn, model_ids: Iterable[int]) -> None:
                 games_played = COALESCE(a.games_played, 0),
                 last_played_at = a.last_played_at,
                 updated_at = NOW()
-            FROM agg a
-            WHERE m.id = a.model_id
-            """,
-            (model_ids,),
-        )
-
-        cursor.execute(
-            """
-            UPDATE models m
-            SET wins = 0,
-                losses = 0,
-                ties = 0,
-                apples_eaten = 0,
-                games_played = 0,
-                last_played_at = NULL,
-                updated_at = NOW()
-            WHERE m.id = ANY(%s)
-              AND NOT EXISTS (
-                  SELECT 1 FROM game_participants gp WHERE gp.model_id = m.id
-              )
+            FROM models m2
+            LEFT JOIN agg a ON a.model_id = m2.id
+            WHERE m.id = m2.id
+              AND m2.id = ANY(%s)
             """,
-            (model_ids,),
+            (model_ids, model_ids),
         )
         conn.commit()
     finally:
@@ -257,12 +290,17 @@ def recompute_aggregates_for_models(conn, model_ids: Iterable[int]) -> None:
 def stream_games_for_models(conn, model_ids: Iterable[int]) -> Iterable[str]:
     """
     Yield game ids (chronological) that include any of the provided models.
+
+    Rows come through a server-side cursor, so only one page of ids is held in
+    memory at a time; the connection must stay open until the generator is done.
+    Rows are plain tuples, since only the id is read.
     """
     model_ids = list(model_ids)
     if not model_ids:
-        return []
+        return
 
-    cursor = conn.cursor()
+    cursor = conn.cursor(name="undo_model_games", cursor_factory=psycopg2.extensions.cursor)
+    cursor.itersize = REPLAY_BATCH_SIZE
     try:
         cursor.execute(
             """
@@ -275,37 +313,105 @@ def stream_games_for_models(conn, model_ids: Iterable[int]) -> Iterable[str]:
             """,
             (model_ids,),
         )
-        rows = cursor.fetchall()
+        for row in cursor:
+            yield row[0]
+    finally:
+        cursor.close()
+
+
+def fetch_participants_for_games(conn, game_ids: List[str]) -> Dict[str, List[Dict]]:
+    """
+    Load participants (with current TrueSkill values) for many games in one query.
+
+    Returns:
+        Dict mapping game id to its participants in player-slot order.
+    """
+    if not game_ids:
+        return {}
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT gp.game_id, gp.model_id, gp.result, m.trueskill_mu, m.trueskill_sigma
+            FROM game_participants gp
+            JOIN models m ON m.id = gp.model_id
+            WHERE gp.game_id = ANY(%s)
+            ORDER BY gp.game_id, gp.player_slot
+            """,
+            (game_ids,),
+        )
+        return {
+            gid: list(rows)
+            for gid, rows in groupby(cursor.fetchall(), key=itemgetter("game_id"))
+        }
     finally:
         cursor.close()
-    for row in rows:
-        yield row["id"]
 
 
 def replay_trueskill_for_models(model_ids: Set[int]) -> int:
     """
     Approximate TrueSkill rebuild: for games involving the impacted models,
     recompute updates but only persist the impacted models' rows.
+
+    Game ids stream from a server-side cursor in REPLAY_BATCH_SIZE batches;
+    each batch's participants are loaded with one query and replayed in
+    memory, and the impacted models' final ratings are written once at the
+    end. Opponents outside the cohort are never written, so their stored
+    ratings are used as-is for every game.
     """
     if not model_ids:
         return 0
 
+    ratings: Dict[int, Rating] = {}
     processed = 0
-    repo = ModelRepository()
     conn = get_connection()
     try:
-        for gid in stream_games_for_models(conn, model_ids):
-            updates = trueskill_engine.rate_game(gid, persist=False, log=False)
-            scoped = [u for u in updates if u["model_id"] in model_ids]
-            if scoped:
-                repo.update_trueskill_batch(scoped)
-            processed += 1
-            if processed % 100 == 0:
-                print(f"Replayed {processed} games for impacted cohort...")
-        return processed
+        game_ids = stream_games_for_models(conn, model_ids)
+        while True:
+            batch = list(islice(game_ids, REPLAY_BATCH_SIZE))
+            if not batch:
+                break
+            participants_by_game = fetch_participants_for_games(conn, batch)
+
+            for gid in batch:
+                participants = participants_by_game.get(gid, [])
+                if len(participants) < 2:
+                    print(f"Game {gid} has fewer than 2 participants; skipping TrueSkill update.")
+                else:
+                    pre_ratings = []
+                    for p in participants:
+                        rating = ratings.get(p["model_id"])
+                        if rating is None:
+                            rating = trueskill_engine.env.Rating(
+                                mu=p["trueskill_mu"] or DEFAULT_MU,
+                                sigma=p["trueskill_sigma"] or DEFAULT_SIGMA,
+                            )
+                        pre_ratings.append(rating)
+                    new_ratings = trueskill_engine.rate_results(
+                        pre_ratings, [p["result"] for p in participants]
+                    )
+                    for p, rating in zip(participants, new_ratings):
+                        if p["model_id"] in model_ids:
+                            ratings[p["model_id"]] = rating
+                processed += 1
+                if processed % 100 == 0:
+                    print(f"Replayed {processed} games for impacted cohort...")
     finally:
         conn.close()
 
+    if ratings:
+        ModelRepository().update_trueskill_batch([
+            {
+                "model_id": mid,
+                "mu": rating.mu,
+                "sigma": rating.sigma,
+                "display_rating": trueskill_engine.display_score(rating),
+            }
+            for mid, rating in ratings.items()
+        ])
+    return processed
+
 
 def main():
     load_dotenv()
@@ -346,6 +452,11 @@ def main():
     )
 
     args = parser.parse_args()
+    # Before opening conn: concurrent index builds wait on every open transaction
+    if not args.dry_run:
+        ensure_game_participants_game_id_index()
+        if not args.skip_replay:
+            ensure_replay_indexes()
     conn = get_connection()
 
     try:
@@ -357,7 +468,7 @@ def main():
         games = fetch_games(conn, args.model_id, all_types=args.all_types)
         game_ids = [g["id"] for g in games]
 
-        impacted_models = collect_impacted_models(conn, game_ids)
+        impacted_models: Set[int] = set().union(*(g["impacted"] for g in games))
         impacted_models.add(args.model_id)
         if args.model_only:
             impacted_models = {args.model_id}
@@ -385,6 +496,13 @@ def main():
             f"{counts['participants_deleted']} participant rows."
         )
 
+        if counts["games_deleted"] == 0:
+            # Nothing left the history, so no rating or aggregate can have changed
+            set_model_status(conn, args.model_id, args.status)
+            print("No games matched; ratings and aggregates unchanged, nothing to recompute.")
+            print("Done.")
+            return
+
         reset_models_to_baseline(conn, impacted_models, status_override={args.model_id: args.status})
         print(f"Reset {len(impacted_models)} models to baseline rating/aggregates.")
 
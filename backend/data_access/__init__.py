@@ -6,7 +6,12 @@ and managing ELO ratings in an event-driven manner.
 """
 
 from .game_persistence import insert_game, insert_game_participants
-from .model_updates import update_model_aggregates, update_elo_ratings, update_trueskill_ratings
+from .model_updates import (
+    update_model_aggregates,
+    update_elo_ratings,
+    update_trueskill_ratings,
+    update_aggregates_and_trueskill_batch,
+)
 from .live_game import (
     insert_initial_game,
     insert_initial_participants,
@@ -22,6 +27,7 @@ __all__ = [
     'update_model_aggregates',
     'update_elo_ratings',
     'update_trueskill_ratings',
+    'update_aggregates_and_trueskill_batch',
     'insert_initial_game',
     'insert_initial_participants',
     'update_game_state',
@@ -5,45 +5,77 @@ These functions provide the database layer for the Flask API endpoints.
 They delegate to the repository classes for actual database operations.
 """
 
-from typing import List, Dict, Any, Optional
+import os
+import time
+from typing import List, Dict, Any, Optional, Tuple
 
+from .cache import cached_model_read
 from .repositories import GameRepository, ModelRepository
 
 # Repository instances
 _game_repo = GameRepository()
 _model_repo = ModelRepository()
 
+# The total games count is a dashboard figure; an exact COUNT(*) scans the
+# whole games table, so one result is shared for a few seconds.
+GAMES_COUNT_CACHE_SECONDS = float(os.getenv("GAMES_COUNT_CACHE_SECONDS", "30"))
+_games_count_cache: Optional[Tuple[float, int]] = None
+
 
 def get_all_models(active_only: bool = False) -> List[Dict[str, Any]]:
     """
     Retrieve all models with their statistics, sorted by ELO rating.
 
+    Served from the model cache (see data_access.cache).
+
     Args:
         active_only: If True, only return active models
 
     Returns:
         List of model dictionaries with stats
     """
-    return _model_repo.get_all(active_only=active_only)
+    return cached_model_read(
+        ("all", active_only),
+        lambda: _model_repo.get_all(active_only=active_only),
+    )
 
 
 def get_model_by_name(model_name: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve a single model by name with its statistics.
 
+    Served from the model cache (see data_access.cache).
+
     Args:
         model_name: The model name to look up
 
     Returns:
         Model dictionary with stats, or None if not found
     """
-    return _model_repo.get_by_name(model_name)
+    return cached_model_read(
+        ("name", model_name),
+        lambda: _model_repo.get_by_name(model_name),
+    )
+
+
+def get_models_by_ids(model_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Retrieve several models by ID in one query.
+
+    Args:
+        model_ids: Model IDs to look up
+
+    Returns:
+        Dict mapping model ID to model dictionary (missing IDs are absent)
+    """
+    return _model_repo.get_by_ids(model_ids)
 
 
 def get_games(
     limit: int = 10,
     offset: int = 0,
-    sort_by: str = "start_time"
+    sort_by: str = "start_time",
+    after: Optional[Tuple[Any, str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Retrieve games with participant information.
@@ -52,11 +84,13 @@ def get_games(
         limit: Maximum number of games to return
         offset: Number of games to skip (for pagination)
         sort_by: Field to sort by ('start_time', 'total_score', 'rounds')
+        after: Keyset cursor (sort value, game id) of the last game on the
+            previous page; takes precedence over offset
 
     Returns:
         List of game dictionaries with participant information
     """
-    return _game_repo.get_games(limit=limit, offset=offset, sort_by=sort_by)
+    return _game_repo.get_games(limit=limit, offset=offset, sort_by=sort_by, after=after)
 
 
 def get_game_by_id(game_id: str) -> Optional[Dict[str, Any]]:
@@ -69,36 +103,28 @@ def get_game_by_id(game_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Game dictionary with participant information, or None if not found
     """
-    game = _game_repo.get_by_id(game_id)
-    if game is None:
-        return None
-
-    # Get participants for backward compatibility format
-    participants = _game_repo.get_participants(game_id)
-    game['participants'] = [
-        {
-            'model_name': p['model_name'],
-            'provider': None,  # Not included in get_participants
-            'player_slot': p['player_slot'],
-            'score': p['score'],
-            'result': p['result'],
-            'death_round': p['death_round'],
-            'death_reason': p['death_reason']
-        }
-        for p in participants
-    ]
-
-    return game
+    return _game_repo.get_by_id_with_participants(game_id)
 
 
 def get_total_games_count() -> int:
     """
     Get the total number of games in the database.
 
+    The count is cached for up to GAMES_COUNT_CACHE_SECONDS, so at most one
+    COUNT(*) runs per period per process regardless of request rate.
+
     Returns:
         Total count of games
     """
-    return _game_repo.get_total_count()
+    global _games_count_cache
+    now = time.monotonic()
+    cached = _games_count_cache
+    if cached is not None and now - cached[0] < GAMES_COUNT_CACHE_SECONDS:
+        return cached[1]
+
+    count = _game_repo.get_total_count()
+    _games_count_cache = (now, count)
+    return count
 
 
 def get_top_apples_game() -> Optional[Dict[str, Any]]:
@@ -0,0 +1,46 @@
+"""
+Process-local cache for model reads.
+
+api_queries serves model lookups from here; ModelRepository's write methods
+and the OpenRouter sync call invalidate_models_cache() after changing the
+models table. Writes made by other processes (the undo/backfill CLIs, other
+workers) are not seen until an entry expires after MODEL_CACHE_SECONDS.
+"""
+
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+MODEL_CACHE_SECONDS = float(os.getenv("MODEL_CACHE_SECONDS", "60"))
+MODEL_CACHE_MAX_ENTRIES = 256
+_model_cache: Dict[Tuple[str, Any], Tuple[float, Any]] = {}
+_model_cache_lock = threading.Lock()
+
+
+def invalidate_models_cache() -> None:
+    """Drop every cached model lookup (call after writing to models)."""
+    with _model_cache_lock:
+        _model_cache.clear()
+
+
+def cached_model_read(key: Tuple[str, Any], load: Callable[[], Any]) -> Any:
+    """
+    Return a deep copy of the cached value for key, loading it on a miss or
+    once it is older than MODEL_CACHE_SECONDS. Copies keep callers that
+    mutate the result from changing what later callers see.
+    """
+    now = time.monotonic()
+    with _model_cache_lock:
+        entry = _model_cache.get(key)
+    if entry is not None and now - entry[0] < MODEL_CACHE_SECONDS:
+        return copy.deepcopy(entry[1])
+
+    value = load()
+    with _model_cache_lock:
+        if key not in _model_cache and len(_model_cache) >= MODEL_CACHE_MAX_ENTRIES:
+            # Evict the oldest insertion
+            del _model_cache[next(iter(_model_cache))]
+        _model_cache[key] = (now, value)
+    return copy.deepcopy(value)
@@ -4,6 +4,8 @@ Model statistics update functions including ELO ratings and aggregates.
 These functions delegate to the ModelRepository for actual database operations.
 """
 
+from typing import Dict, List, Sequence
+
 from .repositories import ModelRepository
 from .repositories.model_repository import get_pair_result, expected_score
 
@@ -17,6 +19,7 @@ __all__ = [
     'update_elo_ratings',
     'update_model_aggregates',
     'update_trueskill_ratings',
+    'update_aggregates_and_trueskill_batch',
 ]
 
 
@@ -54,3 +57,77 @@ def update_trueskill_ratings(game_id: str) -> None:
     # Import here to avoid circular import during module initialization
     from services.trueskill_engine import trueskill_engine
     trueskill_engine.rate_game(game_id)
+
+
+def update_aggregates_and_trueskill_batch(game_ids: Sequence[str]) -> None:
+    """
+    Apply update_model_aggregates and update_trueskill_ratings for a batch of
+    games, in order, with one participant fetch and one write transaction.
+
+    Ratings carry forward in memory from game to game inside the batch, so the
+    result matches processing the games one at a time.
+
+    Args:
+        game_ids: Game identifiers in the order they should be applied
+    """
+    # Import here to avoid circular import during module initialization
+    from services.trueskill_engine import trueskill_engine, DEFAULT_MU, DEFAULT_SIGMA
+
+    participants_by_game = _model_repo.get_participants_for_games(list(game_ids))
+
+    ratings = {}
+    aggregate_deltas: Dict[int, Dict[str, int]] = {}
+    rating_history: List[Dict] = []
+    for game_id in game_ids:
+        participants = participants_by_game.get(game_id, [])
+
+        for p in participants:
+            delta = aggregate_deltas.setdefault(p['model_id'], {
+                'wins': 0, 'losses': 0, 'ties': 0, 'apples_eaten': 0, 'games_played': 0,
+            })
+            if p['result'] == 'won':
+                delta['wins'] += 1
+            elif p['result'] == 'lost':
+                delta['losses'] += 1
+            elif p['result'] == 'tied':
+                delta['ties'] += 1
+            delta['apples_eaten'] += p['score'] or 0
+            delta['games_played'] += 1
+
+        if len(participants) < 2:
+            print(f"Game {game_id} has fewer than 2 participants; skipping TrueSkill update.")
+            continue
+
+        pre_ratings = []
+        for p in participants:
+            rating = ratings.get(p['model_id'])
+            if rating is None:
+                rating = trueskill_engine.env.Rating(
+                    mu=p['trueskill_mu'] or DEFAULT_MU,
+                    sigma=p['trueskill_sigma'] or DEFAULT_SIGMA,
+                )
+            pre_ratings.append(rating)
+
+        new_ratings = trueskill_engine.rate_results(pre_ratings, [p['result'] for p in participants])
+        for p, pre, rating in zip(participants, pre_ratings, new_ratings):
+            ratings[p['model_id']] = rating
+            rating_history.append({
+                'game_id': game_id,
+                'model_id': p['model_id'],
+                'pre_mu': pre.mu,
+                'pre_sigma': pre.sigma,
+                'mu': rating.mu,
+                'sigma': rating.sigma,
+                'exposed': trueskill_engine.conservative_rating(rating),
+            })
+
+    trueskill_updates: List[Dict] = [
+        {
+            'model_id': model_id,
+            'mu': rating.mu,
+            'sigma': rating.sigma,
+            'display_rating': trueskill_engine.display_score(rating),
+        }
+        for model_id, rating in ratings.items()
+    ]
+    _model_repo.apply_game_batch(aggregate_deltas, trueskill_updates, rating_history)
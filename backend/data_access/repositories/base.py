@@ -2,20 +2,15 @@
 Base repository with connection management.
 
 Provides a context manager for database connections that handles:
-- Automatic connection cleanup
+- Borrowing from and returning to the process-wide connection pool
 - Transaction commit on success
 - Transaction rollback on failure
 """
 
 from contextlib import contextmanager
 from typing import Generator, Any
-import sys
-import os
 
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from database_postgres import get_connection
+from database_postgres import get_pool
 
 
 class BaseRepository:
@@ -35,7 +30,7 @@ class BaseRepository:
         - Getting a connection from the pool
         - Committing on successful exit (if auto_commit=True)
         - Rolling back on exception
-        - Closing the connection in all cases
+        - Returning the connection to the pool in all cases
 
         Args:
             auto_commit: If True, commit transaction on successful exit.
@@ -49,7 +44,8 @@ class BaseRepository:
                 cursor.execute("SELECT * FROM models")
                 results = cursor.fetchall()
         """
-        conn = get_connection()
+        pool = get_pool()
+        conn = pool.getconn()
         cursor = conn.cursor()
         try:
             yield conn, cursor
@@ -60,7 +56,7 @@ class BaseRepository:
             raise
         finally:
             cursor.close()
-            conn.close()
+            pool.putconn(conn)
 
     @contextmanager
     def read_connection(self) -> Generator[Any, None, None]:
@@ -73,7 +69,8 @@ class BaseRepository:
         Yields:
             A tuple of (connection, cursor) for database operations.
         """
-        conn = get_connection()
+        pool = get_pool()
+        conn = pool.getconn()
         cursor = conn.cursor()
         try:
             yield conn, cursor
@@ -81,4 +78,5 @@ class BaseRepository:
             raise
         finally:
             cursor.close()
-            conn.close()
+            # putconn rolls back the read's open transaction
+            pool.putconn(conn)
@@ -4,10 +4,40 @@ Game repository for game-related database operations.
 
 import json
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from .base import BaseRepository
 
+# games columns in the order _row_to_game emits them
+_GAME_COLUMNS = (
+    'id', 'status', 'start_time', 'end_time', 'rounds', 'replay_path',
+    'board_width', 'board_height', 'num_apples', 'total_score', 'total_cost',
+    'current_state', 'created_at'
+)
+_TIMESTAMP_COLUMNS = {'start_time', 'end_time', 'created_at'}
+
+
+def _warn_missing_models(
+    participants: List[Dict[str, Any]],
+    inserted_rows: List[Dict[str, Any]]
+) -> None:
+    """Warn about participants whose model name did not resolve to a row."""
+    inserted_slots = {row['player_slot'] for row in inserted_rows}
+    for participant in participants:
+        if participant['player_slot'] not in inserted_slots:
+            print(f"Warning: Model '{participant['model_name']}' not found. Skipping.")
+
+
+def _dedupe_by_slot(participants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Keep one participant per player_slot, the last one given.
+
+    A single INSERT ... ON CONFLICT cannot touch the same (game_id,
+    player_slot) row twice, so repeated slots are collapsed before the
+    unnest arrays are built.
+    """
+    return list({p['player_slot']: p for p in participants}.values())
+
 
 class GameRepository(BaseRepository):
     """
@@ -201,97 +231,135 @@ class GameRepository(BaseRepository):
             if row is None:
                 return None
 
-            return {
-                'id': row['id'],
-                'status': row['status'],
-                'start_time': str(row['start_time']) if row['start_time'] else None,
-                'end_time': str(row['end_time']) if row['end_time'] else None,
-                'rounds': row['rounds'],
-                'replay_path': row['replay_path'],
-                'board_width': row['board_width'],
-                'board_height': row['board_height'],
-                'num_apples': row['num_apples'],
-                'total_score': row['total_score'],
-                'total_cost': row['total_cost'],
-                'current_state': json.loads(row['current_state']) if row['current_state'] else None,
-                'created_at': str(row['created_at']) if row['created_at'] else None
-            }
+            return self._row_to_game(row)
+
+    def get_by_id_with_participants(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a game and its participants in a single round trip.
+
+        Args:
+            game_id: The game identifier
+
+        Returns:
+            Game dictionary with a 'participants' list, or None if not found
+        """
+        with self.read_connection() as (conn, cursor):
+            cursor.execute("""
+                SELECT
+                    g.id, g.status, g.start_time, g.end_time, g.rounds,
+                    g.replay_path, g.board_width, g.board_height, g.num_apples,
+                    g.total_score, g.total_cost, g.current_state, g.created_at,
+                    m.name AS p_name, m.provider AS p_provider,
+                    gp.player_slot, gp.score, gp.result,
+                    gp.death_round, gp.death_reason
+                FROM games g
+                LEFT JOIN game_participants gp ON gp.game_id = g.id
+                LEFT JOIN models m ON gp.model_id = m.id
+                WHERE g.id = %s
+                ORDER BY gp.player_slot
+            """, (game_id,))
+
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+
+            game = self._row_to_game(rows[0])
+            # A game without participants yields one row of NULL participant columns
+            game['participants'] = [
+                {
+                    'model_name': p_row['p_name'],
+                    'provider': p_row['p_provider'],
+                    'player_slot': p_row['player_slot'],
+                    'score': p_row['score'],
+                    'result': p_row['result'],
+                    'death_round': p_row['death_round'],
+                    'death_reason': p_row['death_reason']
+                }
+                for p_row in rows
+                if p_row['p_name'] is not None
+            ]
+            return game
 
     def get_games(
         self,
         limit: int = 10,
         offset: int = 0,
-        sort_by: str = "start_time"
+        sort_by: str = "start_time",
+        after: Optional[Tuple[Any, str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get paginated list of games with participants.
 
+        Games are ordered by the sort field, newest/highest first, with the
+        game id breaking ties. Passing the (sort value, id) of the last game
+        on the previous page as `after` seeks straight to the next page
+        instead of skipping `offset` rows, so deep pages cost the same as the
+        first one.
+
         Args:
             limit: Maximum number of games to return
-            offset: Number of games to skip
+            offset: Number of games to skip (ignored when `after` is given)
             sort_by: Field to sort by ('start_time', 'total_score', 'rounds')
+            after: Keyset cursor (sort value, game id) of the last game seen;
+                the sort value may be None for games that lack it
 
         Returns:
             List of game dictionaries with participant information
         """
-        valid_sort_fields = {
-            'start_time': 'g.start_time DESC',
-            'total_score': 'g.total_score DESC',
-            'rounds': 'g.rounds DESC'
-        }
-        order_clause = valid_sort_fields.get(sort_by, 'g.start_time DESC')
+        valid_sort_fields = {'start_time', 'total_score', 'rounds'}
+        sort_column = sort_by if sort_by in valid_sort_fields else 'start_time'
+
+        where_clause = ""
+        params: List[Any] = []
+        if after is not None:
+            after_value, after_id = after
+            # DESC puts NULLs first, so a NULL cursor continues among the
+            # NULLs and then moves on to every non-NULL row
+            if after_value is None:
+                where_clause = f"WHERE (g.{sort_column} IS NULL AND g.id < %s) OR g.{sort_column} IS NOT NULL"
+                params = [after_id]
+            else:
+                where_clause = f"WHERE (g.{sort_column}, g.id) < (%s, %s)"
+                params = [after_value, after_id]
+            offset = 0
 
         with self.read_connection() as (conn, cursor):
+            # Participants are aggregated per game on the server, so the page
+            # and its players come back in one round trip
             cursor.execute(f"""
-                SELECT
-                    g.id, g.start_time, g.end_time, g.rounds, g.replay_path,
-                    g.board_width, g.board_height, g.num_apples, g.total_score, g.created_at
-                FROM games g
-                ORDER BY {order_clause}
-                LIMIT %s OFFSET %s
-            """, (limit, offset))
-
-            games = []
-            for row in cursor.fetchall():
-                game = {
-                    'id': row['id'],
-                    'start_time': str(row['start_time']) if row['start_time'] else None,
-                    'end_time': str(row['end_time']) if row['end_time'] else None,
-                    'rounds': row['rounds'],
-                    'replay_path': row['replay_path'],
-                    'board_width': row['board_width'],
-                    'board_height': row['board_height'],
-                    'num_apples': row['num_apples'],
-                    'total_score': row['total_score'],
-                    'created_at': str(row['created_at']) if row['created_at'] else None,
-                    'participants': []
-                }
-
-                # Get participants for this game
-                cursor.execute("""
+                WITH page AS (
                     SELECT
-                        m.name, m.provider, gp.player_slot, gp.score,
-                        gp.result, gp.death_round, gp.death_reason
-                    FROM game_participants gp
-                    JOIN models m ON gp.model_id = m.id
-                    WHERE gp.game_id = %s
-                    ORDER BY gp.player_slot
-                """, (game['id'],))
-
-                for p_row in cursor.fetchall():
-                    game['participants'].append({
-                        'model_name': p_row['name'],
-                        'provider': p_row['provider'],
-                        'player_slot': p_row['player_slot'],
-                        'score': p_row['score'],
-                        'result': p_row['result'],
-                        'death_round': p_row['death_round'],
-                        'death_reason': p_row['death_reason']
-                    })
-
-                games.append(game)
+                        g.id, g.start_time, g.end_time, g.rounds, g.replay_path,
+                        g.board_width, g.board_height, g.num_apples, g.total_score, g.created_at
+                    FROM games g
+                    {where_clause}
+                    ORDER BY g.{sort_column} DESC, g.id DESC
+                    LIMIT %s OFFSET %s
+                )
+                SELECT
+                    page.*,
+                    COALESCE((
+                        SELECT jsonb_agg(jsonb_build_object(
+                            'model_name', m.name,
+                            'provider', m.provider,
+                            'player_slot', gp.player_slot,
+                            'score', gp.score,
+                            'result', gp.result,
+                            'death_round', gp.death_round,
+                            'death_reason', gp.death_reason
+                        ) ORDER BY gp.player_slot)
+                        FROM game_participants gp
+                        JOIN models m ON gp.model_id = m.id
+                        WHERE gp.game_id = page.id
+                    ), '[]'::jsonb) AS participants
+                FROM page
+                ORDER BY page.{sort_column} DESC, page.id DESC
+            """, (*params, limit, offset))
 
-            return games
+            return [
+                {**self._row_to_game(row), 'participants': row['participants']}
+                for row in cursor.fetchall()
+            ]
 
     def get_live_games(self) -> List[Dict[str, Any]]:
         """
@@ -440,16 +508,7 @@ class GameRepository(BaseRepository):
             if row is None:
                 return None
 
-            return {
-                'id': row['id'],
-                'total_score': row['total_score'],
-                'replay_path': row['replay_path'],
-                'start_time': str(row['start_time']) if row['start_time'] else None,
-                'end_time': str(row['end_time']) if row['end_time'] else None,
-                'rounds': row['rounds'],
-                'board_width': row['board_width'],
-                'board_height': row['board_height']
-            }
+            return self._row_to_game(row)
 
     # -------------------------------------------------------------------------
     # Participant operations
@@ -474,43 +533,44 @@ class GameRepository(BaseRepository):
                 - death_reason: Reason for death (optional)
                 - cost: API cost (optional)
         """
+        participants = _dedupe_by_slot(participants)
         with self.connection() as (conn, cursor):
-            for participant in participants:
-                # Get model_id from name
-                cursor.execute(
-                    "SELECT id FROM models WHERE name = %s",
-                    (participant['model_name'],)
+            # One statement for all participants: names are resolved to ids
+            # inside the INSERT instead of a SELECT + INSERT per player.
+            cursor.execute("""
+                INSERT INTO game_participants (
+                    game_id, model_id, player_slot, score, result,
+                    death_round, death_reason, cost
                 )
-                row = cursor.fetchone()
-
-                if row is None:
-                    print(f"Warning: Model '{participant['model_name']}' not found. Skipping.")
-                    continue
-
-                model_id = row['id']
-
-                cursor.execute("""
-                    INSERT INTO game_participants (
-                        game_id, model_id, player_slot, score, result,
-                        death_round, death_reason, cost
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (game_id, player_slot)
-                    DO UPDATE SET
-                        score = EXCLUDED.score,
-                        result = EXCLUDED.result,
-                        death_round = EXCLUDED.death_round,
-                        death_reason = EXCLUDED.death_reason,
-                        cost = EXCLUDED.cost
-                """, (
-                    game_id,
-                    model_id,
-                    participant['player_slot'],
-                    participant['score'],
-                    participant['result'],
-                    participant.get('death_round'),
-                    participant.get('death_reason'),
-                    participant.get('cost', 0.0)
-                ))
+                SELECT %s, m.id, v.player_slot, v.score, v.result,
+                       v.death_round, v.death_reason, v.cost
+                FROM unnest(
+                    %s::text[], %s::int[], %s::int[], %s::text[],
+                    %s::int[], %s::text[], %s::float8[]
+                ) AS v(model_name, player_slot, score, result,
+                       death_round, death_reason, cost)
+                JOIN LATERAL (
+                    SELECT id FROM models WHERE name = v.model_name LIMIT 1
+                ) m ON TRUE
+                ON CONFLICT (game_id, player_slot)
+                DO UPDATE SET
+                    score = EXCLUDED.score,
+                    result = EXCLUDED.result,
+                    death_round = EXCLUDED.death_round,
+                    death_reason = EXCLUDED.death_reason,
+                    cost = EXCLUDED.cost
+                RETURNING player_slot
+            """, (
+                game_id,
+                [p['model_name'] for p in participants],
+                [p['player_slot'] for p in participants],
+                [p['score'] for p in participants],
+                [p['result'] for p in participants],
+                [p.get('death_round') for p in participants],
+                [p.get('death_reason') for p in participants],
+                [p.get('cost', 0.0) for p in participants],
+            ))
+            _warn_missing_models(participants, cursor.fetchall())
 
             print(f"Inserted {len(participants)} participants for game {game_id}")
 
@@ -526,32 +586,26 @@ class GameRepository(BaseRepository):
             game_id: The game identifier
             participants: List with keys: model_name, player_slot, opponent_rank_at_match (optional)
         """
+        participants = _dedupe_by_slot(participants)
         with self.connection() as (conn, cursor):
-            for participant in participants:
-                cursor.execute(
-                    "SELECT id FROM models WHERE name = %s",
-                    (participant['model_name'],)
+            cursor.execute("""
+                INSERT INTO game_participants (
+                    game_id, model_id, player_slot, score, result, opponent_rank_at_match
                 )
-                row = cursor.fetchone()
-
-                if row is None:
-                    print(f"Warning: Model '{participant['model_name']}' not found. Skipping.")
-                    continue
-
-                model_id = row['id']
-
-                cursor.execute("""
-                    INSERT INTO game_participants (
-                        game_id, model_id, player_slot, score, result, opponent_rank_at_match
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                """, (
-                    game_id,
-                    model_id,
-                    participant['player_slot'],
-                    0,  # Placeholder
-                    'tied',  # Placeholder
-                    participant.get('opponent_rank_at_match')
-                ))
+                SELECT %s, m.id, v.player_slot, 0, 'tied', v.opponent_rank_at_match
+                FROM unnest(%s::text[], %s::int[], %s::int[])
+                    AS v(model_name, player_slot, opponent_rank_at_match)
+                JOIN LATERAL (
+                    SELECT id FROM models WHERE name = v.model_name LIMIT 1
+                ) m ON TRUE
+                RETURNING player_slot
+            """, (
+                game_id,
+                [p['model_name'] for p in participants],
+                [p['player_slot'] for p in participants],
+                [p.get('opponent_rank_at_match') for p in participants],
+            ))
+            _warn_missing_models(participants, cursor.fetchall())
 
             print(f"Inserted {len(participants)} initial participants for game {game_id}")
 
@@ -592,6 +646,26 @@ class GameRepository(BaseRepository):
                 for row in cursor.fetchall()
             ]
 
+    def _row_to_game(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a games row to a game dictionary.
+
+        Only the game columns present in the row are included, so each query
+        selects just what it returns; timestamps become strings and
+        current_state is decoded.
+        """
+        game = {}
+        for column in _GAME_COLUMNS:
+            if column not in row:
+                continue
+            value = row[column]
+            if column in _TIMESTAMP_COLUMNS:
+                value = str(value) if value else None
+            elif column == 'current_state':
+                value = json.loads(value) if value else None
+            game[column] = value
+        return game
+
 
 # Singleton instance for convenience
 game_repository = GameRepository()
@@ -2,9 +2,15 @@
 Model repository for model-related database operations.
 """
 
+import math
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Generator, List, Optional
 
+import numpy as np
+from psycopg2.extras import execute_values
+
+from ..cache import invalidate_models_cache
 from .base import BaseRepository
 
 
@@ -15,6 +21,9 @@ INITIAL_RATING = 1500
 # Result ranking
 RESULT_RANK = {"won": 2, "tied": 1, "lost": 0}
 
+# 10 ** (d / 400) == exp(d * _ELO_SCALE); exp is cheaper than a float pow
+_ELO_SCALE = math.log(10.0) / 400.0
+
 
 def get_pair_result(result_i: str, result_j: str) -> tuple:
     """
@@ -35,7 +44,7 @@ def get_pair_result(result_i: str, result_j: str) -> tuple:
 
 def expected_score(rating_i: float, rating_j: float) -> float:
     """Compute the expected score for player i vs. player j."""
-    return 1 / (1 + 10 ** ((rating_j - rating_i) / 400))
+    return 1.0 / (1.0 + math.exp((rating_j - rating_i) * _ELO_SCALE))
 
 
 class ModelRepository(BaseRepository):
@@ -43,6 +52,19 @@ class ModelRepository(BaseRepository):
     Repository for models table operations.
     """
 
+    # Lazily set by _rating_history_exists()
+    _has_rating_history: Optional[bool] = None
+
+    @contextmanager
+    def connection(self, auto_commit: bool = True) -> Generator[Any, None, None]:
+        """
+        BaseRepository.connection() for writes to models; the process-local
+        model read cache is cleared once the transaction has completed.
+        """
+        with super().connection(auto_commit) as conn_cursor:
+            yield conn_cursor
+        invalidate_models_cache()
+
     # -------------------------------------------------------------------------
     # Query operations
     # -------------------------------------------------------------------------
@@ -186,6 +208,50 @@ class ModelRepository(BaseRepository):
 
             return self._row_to_model(row)
 
+    def get_by_ids(self, model_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get several models by ID in a single query.
+
+        Args:
+            model_ids: Model IDs to look up (duplicates are fine)
+
+        Returns:
+            Dict mapping model ID to model dictionary; IDs that do not
+            exist are absent
+        """
+        if not model_ids:
+            return {}
+
+        with self.read_connection() as (conn, cursor):
+            cursor.execute("""
+                SELECT
+                    id,
+                    name,
+                    provider,
+                    model_slug,
+                    is_active,
+                    test_status,
+                    elo_rating,
+                    trueskill_mu,
+                    trueskill_sigma,
+                    trueskill_exposed,
+                    trueskill_updated_at,
+                    wins,
+                    losses,
+                    ties,
+                    apples_eaten,
+                    games_played,
+                    pricing_input,
+                    pricing_output,
+                    max_completion_tokens,
+                    last_played_at,
+                    discovered_at
+                FROM models
+                WHERE id = ANY(%s)
+            """, (list(model_ids),))
+
+            return {row['id']: self._row_to_model(row) for row in cursor.fetchall()}
+
     def get_ranked_models(self) -> List[Dict[str, Any]]:
         """
         Get all ranked and active models sorted by TrueSkill exposed rating.
@@ -272,23 +338,38 @@ class ModelRepository(BaseRepository):
             ratings = {p['model_id']: p['elo_rating'] for p in participants}
             names = {p['model_id']: p['name'] for p in participants}
 
-            # Accumulate actual and expected scores (pairwise)
+            if n == 2:
+                # Head-to-head (the usual game): closed form, no matrices
+                s_0, s_1 = get_pair_result(results[0], results[1])
+                e_0 = expected_score(ratings[model_ids[0]], ratings[model_ids[1]])
+                player_scores = [s_0, s_1]
+                player_expected = [e_0, 1.0 - e_0]
+            else:
+                # Actual and expected pairwise scores as n x n matrices (row i is
+                # player i's score against column j), same rules as get_pair_result
+                # and expected_score; summed per player below.
+                ranks = np.fromiter((RESULT_RANK.get(r, 1) for r in results), dtype=float, count=n)
+                r = np.fromiter((ratings[mid] for mid in model_ids), dtype=float, count=n)
+
+                S = np.where(ranks[:, None] > ranks[None, :], 1.0,
+                             np.where(ranks[:, None] < ranks[None, :], 0.0, 0.5))
+                np.fill_diagonal(S, 0.0)
+
+                # Only the upper triangle needs the logistic: E[j, i] == 1 - E[i, j]
+                upper_i, upper_j = np.triu_indices(n, 1)
+                e_upper = 1.0 / (1.0 + np.exp((r[upper_j] - r[upper_i]) * _ELO_SCALE))
+                E = np.zeros((n, n))
+                E[upper_i, upper_j] = e_upper
+                E[upper_j, upper_i] = 1.0 - e_upper
+
+                player_scores = S.sum(axis=1).tolist()
+                player_expected = E.sum(axis=1).tolist()
+
             score_sum = {mid: 0 for mid in model_ids}
             expected_sum = {mid: 0 for mid in model_ids}
-
-            for i in range(n):
-                for j in range(i + 1, n):
-                    mid_i = model_ids[i]
-                    mid_j = model_ids[j]
-
-                    S_i, S_j = get_pair_result(results[i], results[j])
-                    E_i = expected_score(ratings[mid_i], ratings[mid_j])
-                    E_j = expected_score(ratings[mid_j], ratings[mid_i])
-
-                    score_sum[mid_i] += S_i
-                    score_sum[mid_j] += S_j
-                    expected_sum[mid_i] += E_i
-                    expected_sum[mid_j] += E_j
+            for mid, s_i, e_i in zip(model_ids, player_scores, player_expected):
+                score_sum[mid] += s_i
+                expected_sum[mid] += e_i
 
             # Update each model's ELO rating
             for mid in model_ids:
@@ -346,81 +427,159 @@ class ModelRepository(BaseRepository):
                 for row in cursor.fetchall()
             ]
 
-    def update_trueskill_batch(self, updates: List[Dict[str, Any]]) -> None:
+    def update_trueskill_batch(
+        self,
+        updates: List[Dict[str, Any]],
+        game_id: Optional[str] = None,
+    ) -> None:
         """
         Persist TrueSkill updates to models and keep the ELO alias in sync.
 
         Args:
             updates: List of dicts with keys: model_id, mu, sigma, exposed, display_rating
+                (plus pre_mu, pre_sigma when game_id is given)
+            game_id: Game the updates came from. When given and the optional
+                model_rating_history table exists, pre/post snapshots are
+                recorded in the same transaction so the game can later be
+                reverted without a full replay.
         """
         if not updates:
             return
 
         with self.connection() as (conn, cursor):
-            for update in updates:
-                cursor.execute("""
-                    UPDATE models
-                    SET trueskill_mu = %s,
-                        trueskill_sigma = %s,
-                        trueskill_updated_at = CURRENT_TIMESTAMP,
-                        elo_rating = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (
-                    update['mu'],
-                    update['sigma'],
-                    update['display_rating'],
-                    update['model_id']
-                ))
+            self._write_trueskill_updates(cursor, updates)
+            if game_id is not None:
+                self._write_rating_history(cursor, [
+                    {**update, 'game_id': game_id} for update in updates
+                ])
 
-    def update_aggregates_for_game(self, game_id: str) -> None:
+    def get_participants_for_games(self, game_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Update model aggregate statistics for all participants in a game.
+        Fetch participants (with current TrueSkill values) for many games at once.
 
         Args:
-            game_id: The game identifier to process
+            game_ids: Game identifiers
+
+        Returns:
+            Dict mapping game id to its participants in player-slot order, each
+            with model_id, model_name, score, result, trueskill_mu, trueskill_sigma
         """
-        with self.connection() as (conn, cursor):
+        if not game_ids:
+            return {}
+
+        with self.read_connection() as (conn, cursor):
             cursor.execute("""
                 SELECT
-                    gp.model_id, gp.result, gp.score, m.name
+                    gp.game_id,
+                    gp.model_id,
+                    gp.score,
+                    gp.result,
+                    m.name AS model_name,
+                    m.trueskill_mu,
+                    m.trueskill_sigma
                 FROM game_participants gp
                 JOIN models m ON gp.model_id = m.id
-                WHERE gp.game_id = %s
-            """, (game_id,))
-
-            participants = cursor.fetchall()
+                WHERE gp.game_id = ANY(%s)
+                ORDER BY gp.game_id, gp.player_slot
+            """, (list(game_ids),))
 
-            for participant in participants:
-                model_id = participant['model_id']
-                result = participant['result']
-                score = participant['score']
-                name = participant['name']
+            participants_by_game: Dict[str, List[Dict[str, Any]]] = {}
+            for row in cursor.fetchall():
+                participants_by_game.setdefault(row['game_id'], []).append(row)
+            return participants_by_game
+
+    def apply_game_batch(
+        self,
+        aggregate_deltas: Dict[int, Dict[str, int]],
+        trueskill_updates: List[Dict[str, Any]],
+        rating_history: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Apply aggregate increments and TrueSkill results for a batch of games
+        in one transaction.
 
-                win_delta = 1 if result == 'won' else 0
-                loss_delta = 1 if result == 'lost' else 0
-                tie_delta = 1 if result == 'tied' else 0
+        Args:
+            aggregate_deltas: model_id -> dict with wins, losses, ties,
+                apples_eaten, games_played increments
+            trueskill_updates: List of dicts with keys: model_id, mu, sigma, display_rating
+            rating_history: Optional per-game snapshots with keys: game_id,
+                model_id, pre_mu, pre_sigma, mu, sigma, exposed
+        """
+        if not aggregate_deltas and not trueskill_updates and not rating_history:
+            return
 
-                cursor.execute("""
-                    UPDATE models
-                    SET wins = wins + %s,
-                        losses = losses + %s,
-                        ties = ties + %s,
-                        apples_eaten = apples_eaten + %s,
-                        games_played = games_played + 1,
-                        last_played_at = %s,
+        played_at = datetime.now().isoformat()
+        with self.connection() as (conn, cursor):
+            if aggregate_deltas:
+                execute_values(cursor, """
+                    UPDATE models AS m
+                    SET wins = m.wins + v.wins,
+                        losses = m.losses + v.losses,
+                        ties = m.ties + v.ties,
+                        apples_eaten = m.apples_eaten + v.apples_eaten,
+                        games_played = m.games_played + v.games_played,
+                        last_played_at = v.last_played_at,
                         updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """, (
-                    win_delta,
-                    loss_delta,
-                    tie_delta,
-                    score,
-                    datetime.now().isoformat(),
-                    model_id
-                ))
+                    FROM (VALUES %s) AS v(id, wins, losses, ties, apples_eaten, games_played, last_played_at)
+                    WHERE m.id = v.id
+                """, [
+                    (
+                        model_id,
+                        delta['wins'],
+                        delta['losses'],
+                        delta['ties'],
+                        delta['apples_eaten'],
+                        delta['games_played'],
+                        played_at,
+                    )
+                    for model_id, delta in aggregate_deltas.items()
+                ], template="(%s::int, %s::int, %s::int, %s::int, %s::int, %s::int, %s::timestamp)")
+
+            if trueskill_updates:
+                self._write_trueskill_updates(cursor, trueskill_updates)
+
+            if rating_history:
+                self._write_rating_history(cursor, rating_history)
+
+    def update_aggregates_for_game(self, game_id: str) -> None:
+        """
+        Update model aggregate statistics for all participants in a game.
 
-                print(f"Updated aggregates for {name}: +{score} apples, result={result}")
+        All participants are folded into a single UPDATE (one row per model),
+        rather than one UPDATE per participant.
+
+        Args:
+            game_id: The game identifier to process
+        """
+        with self.connection() as (conn, cursor):
+            cursor.execute("""
+                UPDATE models m
+                SET wins = m.wins + d.wins,
+                    losses = m.losses + d.losses,
+                    ties = m.ties + d.ties,
+                    apples_eaten = m.apples_eaten + d.apples_eaten,
+                    games_played = m.games_played + d.games_played,
+                    last_played_at = %s,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT
+                        model_id,
+                        COUNT(*) FILTER (WHERE result = 'won') AS wins,
+                        COUNT(*) FILTER (WHERE result = 'lost') AS losses,
+                        COUNT(*) FILTER (WHERE result = 'tied') AS ties,
+                        COALESCE(SUM(score), 0) AS apples_eaten,
+                        COUNT(*) AS games_played,
+                        string_agg(result, ',' ORDER BY player_slot) AS results
+                    FROM game_participants
+                    WHERE game_id = %s
+                    GROUP BY model_id
+                ) d
+                WHERE m.id = d.model_id
+                RETURNING m.name, d.apples_eaten, d.results
+            """, (datetime.now().isoformat(), game_id))
+
+            for row in cursor.fetchall():
+                print(f"Updated aggregates for {row['name']}: +{row['apples_eaten']} apples, result={row['results']}")
 
     def update_test_status(self, model_id: int, status: str) -> None:
         """
@@ -489,6 +648,59 @@ class ModelRepository(BaseRepository):
     # Helper methods
     # -------------------------------------------------------------------------
 
+    def _rating_history_exists(self, cursor) -> bool:
+        """Whether the optional model_rating_history table exists (checked once per repository)."""
+        if self._has_rating_history is None:
+            cursor.execute("SELECT to_regclass('public.model_rating_history') AS reg")
+            row = cursor.fetchone()
+            self._has_rating_history = bool(row and row['reg'])
+        return self._has_rating_history
+
+    def _write_rating_history(self, cursor, entries: List[Dict[str, Any]]) -> None:
+        """
+        Record pre/post TrueSkill snapshots in model_rating_history, if that
+        optional table exists. Entries carry game_id, model_id, pre_mu,
+        pre_sigma, mu, sigma and exposed; a repeated (game, model) keeps its
+        last entry.
+        """
+        if not entries or not self._rating_history_exists(cursor):
+            return
+        execute_values(cursor, """
+            INSERT INTO model_rating_history (
+                game_id, model_id, pre_mu, pre_sigma, post_mu, post_sigma, exposed
+            )
+            VALUES %s
+            ON CONFLICT (game_id, model_id) DO UPDATE
+            SET pre_mu = EXCLUDED.pre_mu,
+                pre_sigma = EXCLUDED.pre_sigma,
+                post_mu = EXCLUDED.post_mu,
+                post_sigma = EXCLUDED.post_sigma,
+                exposed = EXCLUDED.exposed
+        """, list({
+            (entry['game_id'], entry['model_id']): (
+                entry['game_id'], entry['model_id'], entry['pre_mu'], entry['pre_sigma'],
+                entry['mu'], entry['sigma'], entry['exposed'],
+            )
+            for entry in entries
+        }.values()))
+
+    def _write_trueskill_updates(self, cursor, updates: List[Dict[str, Any]]) -> None:
+        """Write TrueSkill values (and the ELO alias) for many models in one statement."""
+        execute_values(cursor, """
+            UPDATE models AS m
+            SET trueskill_mu = v.mu,
+                trueskill_sigma = v.sigma,
+                trueskill_updated_at = CURRENT_TIMESTAMP,
+                elo_rating = v.display_rating,
+                updated_at = CURRENT_TIMESTAMP
+            FROM (VALUES %s) AS v(id, mu, sigma, display_rating)
+            WHERE m.id = v.id
+        """, list({
+            # Keyed by model so a repeated model keeps its last update
+            update['model_id']: (update['model_id'], update['mu'], update['sigma'], update['display_rating'])
+            for update in updates
+        }.values()), template="(%s::int, %s::float8, %s::float8, %s::float8)")
+
     def _row_to_model(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Convert a database row to a model dictionary."""
         return {
@@ -10,14 +10,51 @@ or any PostgreSQL instance.
 
 import os
 import logging
-from typing import Optional
+import threading
+from typing import Dict, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Process-wide pool, created on first use so importing this module never
+# connects (and pre-fork servers give each worker its own)
+POOL_MIN_CONNECTIONS = 2  # also how many idle connections are kept
+POOL_MAX_CONNECTIONS = 16
+_pool: Optional["BlockingConnectionPool"] = None
+_pool_lock = threading.Lock()
+
+# Set once the unique index on models(model_slug) has been confirmed.
+_slug_index_checked = False
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool whose getconn() waits for a free connection when
+    all of them are borrowed, instead of raising PoolError.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        self._slots.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
 
 def get_connection_string() -> str:
     """
@@ -71,12 +108,204 @@ def get_connection():
         raise
 
 
+def get_pool() -> BlockingConnectionPool:
+    """
+    Get the process-wide connection pool, creating it on first use.
+
+    Borrow with pool.getconn() and return with pool.putconn(conn); putconn
+    rolls back anything left uncommitted and discards broken connections.
+
+    Returns:
+        BlockingConnectionPool whose connections use RealDictCursor
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BlockingConnectionPool(
+                    POOL_MIN_CONNECTIONS,
+                    POOL_MAX_CONNECTIONS,
+                    get_connection_string(),
+                    cursor_factory=RealDictCursor,
+                )
+    return _pool
+
+
+def _create_index_concurrently(cursor, name: str, definition: str, unique: bool = False) -> None:
+    """
+    Build an index without blocking writes. The cursor's connection must be
+    in autocommit mode. A failed concurrent build leaves an invalid index
+    behind, so it is dropped before re-raising.
+    """
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    print(f"Creating {kind.lower()} {name} on {definition}...")
+    try:
+        cursor.execute(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+    except Exception:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        raise
+
+
+def _has_index_on(cursor, table: str, column: str, unique: bool = False) -> bool:
+    """
+    Whether table has a valid index led by column, under any name. With
+    unique=True only a unique index on that single column counts.
+    """
+    cursor.execute(
+        f"""
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a
+          ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = %s::regclass
+          AND i.indisvalid
+          AND a.attname = %s
+          {"AND i.indisunique AND i.indnatts = 1" if unique else ""}
+        LIMIT 1
+        """,
+        (table, column),
+    )
+    return cursor.fetchone() is not None
+
+
+def ensure_game_participants_game_id_index() -> None:
+    """
+    Make sure game_participants can be looked up by game_id.
+
+    Undo scripts delete participants by game id; without an index whose
+    leading column is game_id each delete scans the whole table. Builds the
+    index CONCURRENTLY (so live writes aren't blocked) on a dedicated
+    autocommit connection, and only warns if that fails.
+    """
+    conn = get_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    try:
+        if not _has_index_on(cursor, "game_participants", "game_id"):
+            _create_index_concurrently(
+                cursor, "idx_game_participants_game_id", "game_participants (game_id)"
+            )
+
+    except Exception as e:
+        print(f"Warning: could not ensure index on game_participants.game_id: {e}")
+
+    finally:
+        conn.close()
+
+
+def ensure_model_slug_index() -> None:
+    """
+    Make sure models.model_slug has a unique btree index.
+
+    Every per-model lookup in the OpenRouter sync is keyed by slug, so
+    without the index each one is a sequential scan. Checked once per
+    process; built CONCURRENTLY on a dedicated autocommit connection if no
+    valid unique single-column index on model_slug exists yet, and only
+    warns if that fails.
+    """
+    global _slug_index_checked
+    if _slug_index_checked:
+        return
+
+    conn = get_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    try:
+        if not _has_index_on(cursor, "models", "model_slug", unique=True):
+            _create_index_concurrently(
+                cursor, "models_model_slug_uq", "models (model_slug)", unique=True
+            )
+        _slug_index_checked = True
+
+    except Exception as e:
+        print(f"Warning: could not ensure unique index on models.model_slug: {e}")
+
+    finally:
+        conn.close()
+
+
+# Indexes backing the chronological history scans of the replay/backfill
+# scripts: games in (start_time, end_time, id) order, and a model's games.
+REPLAY_INDEXES = {
+    "idx_games_start_end_id": "games (start_time NULLS FIRST, end_time NULLS FIRST, id)",
+    "idx_game_participants_model_game": "game_participants (model_id, game_id)",
+}
+
+
+def _ensure_indexes(indexes: Dict[str, str], label: str) -> None:
+    """
+    Build whichever of the named indexes don't exist yet (or were left
+    invalid by an earlier failed build). Built CONCURRENTLY on a dedicated
+    autocommit connection; only warns on failure.
+    """
+    conn = get_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = ANY(%s)
+              AND i.indisvalid
+            """,
+            (list(indexes),),
+        )
+        existing = {row['relname'] for row in cursor.fetchall()}
+        for name, definition in indexes.items():
+            if name not in existing:
+                # Drops an invalid leftover from an earlier failed build first
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                _create_index_concurrently(cursor, name, definition)
+
+    except Exception as e:
+        print(f"Warning: could not ensure {label} indexes: {e}")
+
+    finally:
+        conn.close()
+
+
+def ensure_replay_indexes() -> None:
+    """
+    Make sure the indexes in REPLAY_INDEXES exist, so replays stream games
+    with an index scan instead of sorting the whole history first.
+    """
+    _ensure_indexes(REPLAY_INDEXES, "replay")
+
+
+# Indexes backing the API's hot reads: each get_games sort order with its id
+# tiebreaker (so a page is a short index scan rather than a sort of every
+# game, and a keyset cursor seeks straight to its page), the top-apples
+# lookup, and a game's participants in slot order. The models table is small
+# and sorted by an expression, so it is left to a sequential scan.
+API_INDEXES = {
+    "idx_games_start_time_desc": "games (start_time DESC, id DESC)",
+    "idx_games_total_score_desc": "games (total_score DESC, id DESC)",
+    "idx_games_rounds_desc": "games (rounds DESC, id DESC)",
+    "idx_games_top_apples": (
+        "games (total_score DESC, start_time DESC) "
+        "WHERE total_score IS NOT NULL AND replay_path IS NOT NULL"
+    ),
+    "idx_game_participants_game_slot": "game_participants (game_id, player_slot)",
+}
+
+
+def ensure_api_indexes() -> None:
+    """Make sure the indexes in API_INDEXES exist."""
+    _ensure_indexes(API_INDEXES, "API")
+
+
 def init_database() -> None:
     """
     Initialize the database schema.
     This is now handled by the SQL migration file (001_initial_schema.sql).
 
-    Run that migration in your database admin tool or via Drizzle.
+    Run that migration in your database admin tool or via Drizzle. Once the
+    tables exist, the API read indexes (API_INDEXES) are created if missing.
     """
     print("Database schema should be initialized via migrations.")
     print("For ARC Explainer, run: npm run db:push")
@@ -106,6 +335,9 @@ def init_database() -> None:
         cursor.close()
         conn.close()
 
+        if len(tables) == 3:
+            ensure_api_indexes()
+
     except Exception as e:
         print(f"[ERROR] Failed to connect to PostgreSQL: {e}")
         print("Make sure DATABASE_URL is set correctly.")
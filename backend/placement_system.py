@@ -11,10 +11,13 @@ system only handles:
 
 from typing import Optional, Tuple, Set, List, Dict, Any
 from dataclasses import dataclass
+from bisect import bisect_left
 import math
 import sys
 import os
 
+import numpy as np
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from database_postgres import get_connection
 from services.trueskill_engine import (
@@ -110,9 +113,16 @@ class PlacementState:
 # DB helpers
 # =============================================================================
 
-def _read_model_trueskill(model_id: int) -> Tuple[float, float]:
-    """Read current trueskill_mu and trueskill_sigma from the DB."""
-    conn = get_connection()
+def _read_model_trueskill(model_id: int, conn=None) -> Tuple[float, float]:
+    """
+    Read current trueskill_mu and trueskill_sigma from the DB.
+
+    Uses `conn` when given (left open for the caller); otherwise opens and
+    closes a connection of its own.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -127,23 +137,30 @@ def _read_model_trueskill(model_id: int) -> Tuple[float, float]:
             row.get('trueskill_sigma') or TS_DEFAULT_SIGMA,
         )
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 # =============================================================================
 # Core Functions
 # =============================================================================
 
-def get_ranked_models_by_index() -> List[Dict[str, Any]]:
+def get_ranked_models_by_index(conn=None) -> List[Dict[str, Any]]:
     """
     Get all ranked models sorted by conservative TrueSkill (exposed).
 
+    Args:
+        conn: Optional open connection to reuse (left open for the caller)
+
     Returns:
         List of dicts with keys:
             id, name, rating, rank_index, pricing_input, pricing_output, provider
-        where rank_index 0 = best, N-1 = worst
+        where rank_index 0 = best, N-1 = worst. Unrated models sort as 0.0,
+        the rating they are given, so ratings are non-increasing down the list.
     """
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -151,7 +168,7 @@ def get_ranked_models_by_index() -> List[Dict[str, Any]]:
             SELECT id, name, trueskill_exposed, pricing_input, pricing_output, provider
             FROM models
             WHERE test_status = 'ranked' AND is_active = TRUE
-            ORDER BY trueskill_exposed DESC NULLS LAST
+            ORDER BY COALESCE(trueskill_exposed, 0) DESC, id
         """)
 
         models = cursor.fetchall()
@@ -169,7 +186,8 @@ def get_ranked_models_by_index() -> List[Dict[str, Any]]:
         ]
 
     finally:
-        conn.close()
+        if own_conn:
+            conn.close()
 
 
 def init_placement_state(model_id: int, max_games: int = 9) -> PlacementState:
@@ -215,15 +233,41 @@ def calculate_information_gain(
     Returns:
         Information gain score (higher = more informative)
     """
-    repeat_penalty = 0.1 ** play_count  # 1.0, 0.1, 0.01, ...
+    gains = calculate_information_gain_array(
+        mu, sigma, np.array([opponent_rating], dtype=float), np.array([play_count])
+    )
+    return float(gains[0])
+
+
+def calculate_information_gain_array(
+    mu: float,
+    sigma: float,
+    opponent_ratings: np.ndarray,
+    play_counts: np.ndarray,
+) -> np.ndarray:
+    """
+    Expected information gain for many candidate opponents at once.
+
+    calculate_information_gain is the single-opponent form of this function.
+
+    Args:
+        mu: Current model's TrueSkill mu
+        sigma: Current model's TrueSkill sigma
+        opponent_ratings: Ratings of the candidates (TrueSkill exposed)
+        play_counts: How many times we've played each candidate
+
+    Returns:
+        Array of information gain scores, aligned with the inputs
+    """
+    repeat_penalty = 0.1 ** play_counts  # 1.0, 0.1, 0.01, ...
 
-    distance_from_estimate = abs(opponent_rating - mu)
+    distance_from_estimate = np.abs(opponent_ratings - mu)
     optimal_distance = sigma * 0.5
 
     if sigma > 0:
-        distance_factor = math.exp(-((distance_from_estimate - optimal_distance) ** 2) / (2 * sigma ** 2))
+        distance_factor = np.exp(-((distance_from_estimate - optimal_distance) ** 2) / (2 * sigma ** 2))
     else:
-        distance_factor = 1.0 if distance_from_estimate < 50 else 0.0
+        distance_factor = np.where(distance_from_estimate < 50, 1.0, 0.0)
 
     uncertainty_factor = sigma / TS_DEFAULT_SIGMA
 
@@ -252,9 +296,79 @@ def should_rematch(
     return score_diff <= 1
 
 
+def _median_of_descending(ratings: List[float]) -> float:
+    """
+    Upper median of a descending-sorted list.
+
+    Same element as sorted(ratings)[len(ratings) // 2], without the sort.
+    """
+    n = len(ratings)
+    return ratings[n - 1 - n // 2]
+
+
+@dataclass(frozen=True, eq=False)
+class OpponentContext:
+    """
+    Per-leaderboard inputs to opponent selection, prepared once.
+
+    The ranked list is fixed for a whole evaluation sweep, so its ratings,
+    frontier flags, log-costs and id index are built once here and reused
+    for every candidate instead of being re-derived on each selection.
+    """
+    ranked_models: List[Dict[str, Any]]
+    ids: np.ndarray
+    ratings: np.ndarray
+    frontier: np.ndarray
+    log_costs: np.ndarray  # log10(pricing_input + pricing_output); NaN if no cost
+    index_by_id: Dict[int, int]
+    overall_median: float
+
+
+def build_opponent_context(ranked_models: List[Dict[str, Any]]) -> OpponentContext:
+    """
+    Prepare an OpponentContext for a ranked list (in rank order).
+
+    Medians are read by index, so a list whose ratings are not descending
+    is stably re-sorted by rating first.
+    """
+    n = len(ranked_models)
+    ratings = np.fromiter((m['rating'] for m in ranked_models), dtype=float, count=n)
+    if np.any(ratings[1:] > ratings[:-1]):
+        order = np.argsort(-ratings, kind='stable')
+        ratings = ratings[order]
+        ranked_models = [ranked_models[i] for i in order]
+
+    costs = np.fromiter(
+        (float(m.get('pricing_input') or 0) + float(m.get('pricing_output') or 0) for m in ranked_models),
+        dtype=float,
+        count=n,
+    )
+    log_costs = np.full(n, np.nan)
+    np.log10(costs, out=log_costs, where=costs > 0)
+
+    index_by_id: Dict[int, int] = {}
+    for idx, m in enumerate(ranked_models):
+        index_by_id.setdefault(m['id'], idx)
+
+    return OpponentContext(
+        ranked_models=ranked_models,
+        ids=np.array([m['id'] for m in ranked_models]),
+        ratings=ratings,
+        frontier=np.fromiter(
+            ((m.get('provider') or '').lower() in FRONTIER_PROVIDERS for m in ranked_models),
+            dtype=bool,
+            count=n,
+        ),
+        log_costs=log_costs,
+        index_by_id=index_by_id,
+        overall_median=float(_median_of_descending(ratings)) if n else 0.0,
+    )
+
+
 def _pricing_target(
     model_pricing: Optional[Tuple[float, float]],
     ranked_models: List[Dict[str, Any]],
+    context: Optional[OpponentContext] = None,
 ) -> float:
     """
     Compute a target rating based on pricing similarity.
@@ -262,11 +376,15 @@ def _pricing_target(
     Finds ranked models within ~0.5 log10 of the evaluated model's cost
     (same order of magnitude) and returns the median rating of that cohort.
     Falls back to the overall median rating if no pricing data or no matches.
+
+    `ranked_models` is in rank order (rating descending, as returned by
+    get_ranked_models_by_index), so medians are read by index, not re-sorted.
     """
-    all_ratings = [m['rating'] for m in ranked_models]
-    if not all_ratings:
+    if context is None:
+        context = build_opponent_context(ranked_models)
+    if not context.ranked_models:
         return 0.0
-    overall_median = sorted(all_ratings)[len(all_ratings) // 2]
+    overall_median = context.overall_median
 
     if model_pricing is None:
         return overall_median
@@ -278,21 +396,14 @@ def _pricing_target(
 
     log_model = math.log10(model_cost)
 
-    cohort_ratings = []
-    for m in ranked_models:
-        mp_in = m.get('pricing_input') or 0
-        mp_out = m.get('pricing_output') or 0
-        m_cost = float(mp_in) + float(mp_out)
-        if m_cost <= 0:
-            continue
-        if abs(math.log10(m_cost) - log_model) <= 0.5:
-            cohort_ratings.append(m['rating'])
+    # NaN log-costs (unpriced models) compare False and drop out
+    cohort_ratings = context.ratings[np.abs(context.log_costs - log_model) <= 0.5]
 
-    if not cohort_ratings:
+    if cohort_ratings.size == 0:
         return overall_median
 
-    cohort_ratings.sort()
-    return cohort_ratings[len(cohort_ratings) // 2]
+    # Masked in rank order, so already descending
+    return float(_median_of_descending(cohort_ratings))
 
 
 def select_next_opponent(
@@ -307,6 +418,7 @@ def select_next_opponent_with_reason(
     state: PlacementState,
     ranked_models: Optional[List[Dict[str, Any]]] = None,
     model_pricing: Optional[Tuple[float, float]] = None,
+    context: Optional[OpponentContext] = None,
 ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
     """
     Select the next opponent.
@@ -323,28 +435,30 @@ def select_next_opponent_with_reason(
         state: Current placement state
         ranked_models: List of ranked model dicts
         model_pricing: Optional (pricing_input, pricing_output) for the evaluated model
+        context: Prepared OpponentContext for the ranked list; pass one when
+            selecting for many models against the same leaderboard
     """
     debug: Dict[str, Any] = {}
 
     if state.games_played >= state.max_games:
         return None, debug
 
-    if ranked_models is None:
-        ranked_models = get_ranked_models_by_index()
+    if context is None:
+        if ranked_models is None:
+            ranked_models = get_ranked_models_by_index()
+        context = build_opponent_context(ranked_models)
+    ranked_models = context.ranked_models
 
     if not ranked_models:
         print("  No ranked models available for placement")
         return None, debug
 
-    candidates = [m for m in ranked_models if m['id'] != state.model_id]
-
-    if not candidates:
-        return None, debug
-
     # Check for pending rematch
     if state.pending_rematch is not None:
-        for m in candidates:
-            if m['id'] == state.pending_rematch:
+        if state.pending_rematch != state.model_id:
+            idx = context.index_by_id.get(state.pending_rematch)
+            if idx is not None:
+                m = ranked_models[idx]
                 debug.update({
                     "reason": "pending_rematch",
                     "opponent_id": m['id'],
@@ -352,12 +466,14 @@ def select_next_opponent_with_reason(
                 return m, debug
         state.pending_rematch = None
 
-    # Hard cap: remove opponents already played MAX_PLACEMENT_REPEATS times
-    candidates = [
-        m for m in candidates
-        if state.opponent_play_counts.get(m['id'], 0) < MAX_PLACEMENT_REPEATS
-    ]
-    if not candidates:
+    # Exclude ourselves and opponents already played MAX_PLACEMENT_REPEATS
+    # times (hard cap) with one vectorized membership test.
+    excluded = frozenset(
+        opp_id for opp_id, count in state.opponent_play_counts.items()
+        if count >= MAX_PLACEMENT_REPEATS
+    ) | {state.model_id}
+    cand_idx = np.flatnonzero(~np.isin(context.ids, list(excluded)))
+    if cand_idx.size == 0:
         return None, debug
 
     # If we just won, prefer strictly higher-rated opponents to keep climbing
@@ -366,54 +482,48 @@ def select_next_opponent_with_reason(
     if last_game and last_game.get("result") == "won":
         last_win_rating = last_game.get("opponent_rating")
 
-    filtered_candidates = candidates
     if last_win_rating is not None:
-        upward = [c for c in candidates if c['rating'] > last_win_rating + MIN_ASCEND_RATING_DELTA]
-        if upward:
-            filtered_candidates = upward
+        upward = cand_idx[context.ratings[cand_idx] > last_win_rating + MIN_ASCEND_RATING_DELTA]
+        if upward.size:
+            cand_idx = upward
             debug["ascend_filter_from"] = last_win_rating
-            debug["ascend_filter_count"] = len(upward)
-
-    candidates = filtered_candidates
+            debug["ascend_filter_count"] = int(upward.size)
 
     # Blended target: pricing-based early, TrueSkill-based later
-    pricing_target = _pricing_target(model_pricing, ranked_models)
+    pricing_target = _pricing_target(model_pricing, ranked_models, context=context)
     alpha = min(state.games_played / 4.0, 1.0)  # 0→pricing, 1→rating
     target_rating = alpha * state.exposed + (1 - alpha) * pricing_target
     debug["target_rating"] = target_rating
     debug["pricing_target"] = pricing_target
     debug["alpha"] = alpha
 
-    # Score each candidate by distance to target, breaking ties with information gain
-    best = None
-    best_key = None
-    for m in candidates:
-        model_id = m['id']
-        name = m['name']
-        rating = m['rating']
-        rank = m['rank_index']
-        play_count = state.opponent_play_counts.get(model_id, 0)
-        info_gain = calculate_information_gain(state.mu, state.sigma, rating, model_id, play_count)
-
-        # Frontier bonus
-        provider = (m.get('provider') or '').lower()
-        if provider in FRONTIER_PROVIDERS:
-            info_gain *= FRONTIER_BONUS
-
-        distance = abs(rating - target_rating)
-        key = (distance, -info_gain)
-        if best is None or key < best_key:
-            best = m
-            best_key = key
-            debug.update({
-                "selected_id": model_id,
-                "selected_name": name,
-                "selected_rating": rating,
-                "selected_rank": rank,
-                "distance_to_target": distance,
-                "info_gain": info_gain,
-                "play_count": play_count,
-            })
+    # Score all candidates at once: distance to target, ties broken by
+    # information gain (with frontier bonus). lexsort is stable, so exact
+    # ties keep the first candidate in rank order, as a sequential scan would.
+    all_play_counts = np.zeros(len(ranked_models))
+    for opp_id, count in state.opponent_play_counts.items():
+        idx = context.index_by_id.get(opp_id)
+        if idx is not None:
+            all_play_counts[idx] = count
+
+    ratings = context.ratings[cand_idx]
+    play_counts = all_play_counts[cand_idx]
+
+    info_gains = calculate_information_gain_array(state.mu, state.sigma, ratings, play_counts)
+    info_gains = np.where(context.frontier[cand_idx], info_gains * FRONTIER_BONUS, info_gains)
+    distances = np.abs(ratings - target_rating)
+
+    best_idx = int(np.lexsort((-info_gains, distances))[0])
+    best = ranked_models[int(cand_idx[best_idx])]
+    debug.update({
+        "selected_id": best['id'],
+        "selected_name": best['name'],
+        "selected_rating": best['rating'],
+        "selected_rank": best['rank_index'],
+        "distance_to_target": float(distances[best_idx]),
+        "info_gain": float(info_gains[best_idx]),
+        "play_count": int(play_counts[best_idx]),
+    })
 
     return best, debug
 
@@ -468,7 +578,9 @@ def get_final_rank(
     """
     Determine final rank based on exposed rating.
 
-    Compares the model's exposed rating against all ranked models.
+    Counts the ranked models rated strictly above the model's exposed rating.
+    `ranked_models` is in rank order (rating descending), so the count is
+    found by binary search rather than a full scan.
     """
     if ranked_models is None:
         ranked_models = get_ranked_models_by_index()
@@ -476,30 +588,27 @@ def get_final_rank(
     if not ranked_models:
         return 0
 
-    final_rank = 0
-    for idx, m in enumerate(ranked_models):
-        if state.exposed < m['rating']:
-            final_rank = idx + 1
-
-    return final_rank
+    return bisect_left(ranked_models, -state.exposed, key=lambda m: -m['rating'])
 
 
 def rebuild_state_from_history(
     model_id: int,
     max_games: int,
     history: List[Dict[str, Any]],
-    ranked_models: List[Dict[str, Any]]
+    ranked_models: List[Dict[str, Any]],
+    conn=None,
 ) -> Tuple[PlacementState, int]:
     """
     Reconstruct placement state from completed evaluation games.
 
     Only replays bookkeeping (opponents played, history, game count).
-    Reads current mu/sigma from DB instead of replaying custom math.
+    Reads current mu/sigma from DB instead of replaying custom math, on
+    `conn` if one is given.
     """
     rating_lookup = {m['id']: m['rating'] for m in ranked_models}
 
     # Read current mu/sigma from DB
-    mu, sigma = _read_model_trueskill(model_id)
+    mu, sigma = _read_model_trueskill(model_id, conn=conn)
 
     state = PlacementState(
         model_id=model_id,
@@ -558,11 +667,25 @@ def rebuild_state_from_history(
 # Utility Functions
 # =============================================================================
 
+def build_rank_lookup(ranked_models: List[Dict[str, Any]]) -> Dict[int, int]:
+    """Map model id -> rank_index, built once per ranked list for O(1) lookups."""
+    return {m['id']: m['rank_index'] for m in ranked_models}
+
+
 def get_opponent_rank_index(
     opponent_id: int,
-    ranked_models: Optional[List[Dict[str, Any]]] = None
+    ranked_models: Optional[List[Dict[str, Any]]] = None,
+    rank_lookup: Optional[Dict[int, int]] = None,
 ) -> Optional[int]:
-    """Get the current rank index of an opponent."""
+    """
+    Get the current rank index of an opponent.
+
+    Pass `rank_lookup` (from build_rank_lookup) when calling repeatedly
+    against the same ranked list to avoid a linear scan per call.
+    """
+    if rank_lookup is not None:
+        return rank_lookup.get(opponent_id)
+
     if ranked_models is None:
         ranked_models = get_ranked_models_by_index()
 
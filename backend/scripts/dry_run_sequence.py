@@ -39,11 +39,11 @@ def fetch_ranked_models() -> list:
                pricing_input,
                pricing_output,
                provider,
-               ROW_NUMBER() OVER (ORDER BY trueskill_exposed DESC NULLS LAST) - 1 AS rank_index
+               ROW_NUMBER() OVER (ORDER BY COALESCE(trueskill_exposed, 0) DESC, id) - 1 AS rank_index
         FROM models
         WHERE is_active = TRUE
           AND test_status = 'ranked'
-        ORDER BY trueskill_exposed DESC NULLS LAST
+        ORDER BY COALESCE(trueskill_exposed, 0) DESC, id
         """
     )
     rows = cur.fetchall()
@@ -189,11 +189,13 @@ def sync_openrouter_catalog() -> None:
             return
 
         logger.info(
-            "OpenRouter sync complete. total=%s added=%s updated=%s skipped=%s",
+            "OpenRouter sync complete. total=%s added=%s updated=%s unchanged=%s skipped=%s rejected=%s",
             stats.get("total", 0),
             stats.get("added", 0),
             stats.get("updated", 0),
+            stats.get("unchanged", 0),
             stats.get("skipped", 0),
+            stats.get("errors", 0),
         )
     except Exception:
         logger.exception("OpenRouter model sync failed")
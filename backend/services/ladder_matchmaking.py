@@ -18,7 +18,7 @@ import random
 from typing import Dict, List, Set, Tuple, Any
 
 from data_access.repositories import ModelRepository
-from data_access.api_queries import get_model_by_name
+from data_access.api_queries import get_models_by_ids
 from tasks import run_game_task
 
 logger = logging.getLogger(__name__)
@@ -214,11 +214,12 @@ def dispatch_ladder_games() -> Dict[str, Any]:
             used_models.add(a['id'])
             used_models.add(b['id'])
 
-    # 6. Dispatch selected games
+    # 6. Dispatch selected games (configs for every selected model in one query)
+    configs = get_models_by_ids([m['id'] for pair in selected for m in pair])
     for model_a, model_b in selected:
         try:
-            config_a = get_model_by_name(model_a['name'])
-            config_b = get_model_by_name(model_b['name'])
+            config_a = configs.get(model_a['id'])
+            config_b = configs.get(model_b['id'])
 
             if config_a is None or config_b is None:
                 logger.warning(
@@ -23,6 +23,8 @@ DEFAULT_BETA = DEFAULT_MU / 6.0
 DEFAULT_TAU = 0.5
 DEFAULT_DRAW_PROBABILITY = 0.1
 DISPLAY_MULTIPLIER = 50.0  # Scales conservative rating into the UI-friendly number
+# Display rating of a fresh model; what baseline resets write to elo_rating
+BASELINE_DISPLAY_RATING = (DEFAULT_MU - 3.0 * DEFAULT_SIGMA) * DISPLAY_MULTIPLIER
 
 # Result ranking (lower is better)
 RESULT_RANK = {"won": 0, "tied": 1, "lost": 2}
@@ -91,22 +93,30 @@ class TrueSkillEngine:
 
         return states
 
+    def rate_results(self, ratings: List[Rating], results: List[str]) -> List[Rating]:
+        """
+        Rate one free-for-all game given each player's pre-game rating and
+        result string. Returns the post-game ratings in the same order.
+        """
+        teams = [[rating] for rating in ratings]
+        ranks = [self._rank_from_result(result) for result in results]
+        return [team[0] for team in self.env.rate(teams, ranks=ranks)]
+
     def _compute_updates(self, participants: List[ParticipantState]) -> List[Dict[str, Any]]:
         """
         Compute TrueSkill updates for a set of participants.
         """
-        teams = [[p.rating] for p in participants]
-        ranks = [self._rank_from_result(p.result) for p in participants]
-
-        rated_teams = self.env.rate(teams, ranks=ranks)
+        new_ratings = self.rate_results(
+            [p.rating for p in participants],
+            [p.result for p in participants],
+        )
 
         updates = []
-        for participant, rated_team in zip(participants, rated_teams):
+        for participant, new_rating in zip(participants, new_ratings):
             pre_rating = participant.rating
             pre_exposed = self.conservative_rating(pre_rating)
             pre_display = self.display_score(pre_rating)
 
-            new_rating = rated_team[0]
             conservative = self.conservative_rating(new_rating)
             display_rating = self.display_score(new_rating)
 
@@ -148,7 +158,7 @@ class TrueSkillEngine:
         updates = self._compute_updates(participants)
 
         if persist:
-            self.model_repo.update_trueskill_batch(updates)
+            self.model_repo.update_trueskill_batch(updates, game_id=game_id)
 
         if log:
             for u in updates:
@@ -7,6 +7,7 @@ like model evaluations, game completions, etc.
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -14,6 +15,12 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Shared session so repeated webhook POSTs (e.g. one per newly synced model,
+# sent from a thread pool) reuse pooled keep-alive connections instead of
+# paying a TCP+TLS handshake each time.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_maxsize=16))
+
 
 def send_webhook(url: str, data: Dict[str, Any], timeout: int = 10) -> bool:
     """
@@ -32,7 +39,7 @@ def send_webhook(url: str, data: Dict[str, Any], timeout: int = 10) -> bool:
         return False
 
     try:
-        response = requests.post(
+        response = _session.post(
             url,
             json=data,
             timeout=timeout,
@@ -131,3 +131,26 @@ def generate_video_task(self, game_id: str) -> Dict[str, str]:
     except Exception as e:
         logger.error(f"Video generation failed for game {game_id}: {e}", exc_info=True)
         raise
+
+
+@app.task(name='backend.tasks.sync_openrouter_models_task')
+def sync_openrouter_models_task() -> Dict[str, int]:
+    """
+    Sync the OpenRouter model catalog from inside a warm worker.
+
+    Running here reuses the worker's already-imported DB/HTTP stack (and the
+    sync module's keep-alive session and ETag cache) instead of paying the
+    interpreter and import start-up cost of the CLI on every run. The API key
+    is read from the worker's OPENROUTER_API_KEY rather than sent through the
+    broker.
+
+    Returns:
+        Sync statistics from sync_models
+    """
+    import os
+    # Lazy import to keep game workers light until a sync is requested
+    from cli.sync_openrouter_models import sync_models
+
+    stats = sync_models(api_key=os.getenv('OPENROUTER_API_KEY'))
+    logger.info(f"OpenRouter sync finished: {stats}")
+    return stats
@@ -0,0 +1,86 @@
+"""
+Tests for the Flask API in app.py.
+
+Data access functions are patched where app.py imports them, so no
+database is needed.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def _game(game_id, start_time, total_score, rounds):
+    return {
+        'id': game_id,
+        'start_time': start_time,
+        'end_time': None,
+        'rounds': rounds,
+        'replay_path': None,
+        'board_width': 10,
+        'board_height': 10,
+        'total_score': total_score,
+        'total_cost': 0.0,
+        'participants': [],
+    }
+
+
+class TestGamesCursor:
+    """Tests for keyset pagination on /api/games."""
+
+    @pytest.mark.parametrize('sort_by, expected_value', [
+        ('start_time', datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)),
+        ('total_score', 7),
+        ('rounds', 42),
+    ])
+    @patch('app.get_games')
+    def test_next_cursor_round_trip(self, mock_get_games, client, sort_by, expected_value):
+        """next_cursor from one page is accepted as the `after` of the next."""
+        mock_get_games.return_value = [
+            _game('g1', '2025-01-02 04:00:00+00:00', 9, 50),
+            _game('g2', '2025-01-02 03:04:05+00:00', 7, 42),
+        ]
+
+        first = client.get(f'/api/games?limit=2&sort_by={sort_by}')
+        assert first.status_code == 200
+        cursor = first.get_json()['next_cursor']
+        assert cursor['after_id'] == 'g2'
+
+        second = client.get('/api/games', query_string={'limit': 2, 'sort_by': sort_by, **cursor})
+        assert second.status_code == 200
+        assert mock_get_games.call_args.kwargs['after'] == (expected_value, 'g2')
+
+    @patch('app.get_games')
+    def test_null_cursor_value(self, mock_get_games, client):
+        """A cursor without after_value seeks past a NULL sort value."""
+        mock_get_games.return_value = []
+
+        response = client.get('/api/games?sort_by=total_score&after_id=g2')
+
+        assert response.status_code == 200
+        assert mock_get_games.call_args.kwargs['after'] == (None, 'g2')
+
+    @pytest.mark.parametrize('sort_by, after_value', [
+        ('start_time', 'yesterday'),
+        ('total_score', 'abc'),
+        ('rounds', 'nan'),
+        ('rounds', 'inf'),
+    ])
+    @patch('app.get_games')
+    def test_invalid_cursor_rejected(self, mock_get_games, client, sort_by, after_value):
+        """A cursor value that does not fit the sort column is a 400, not a 500."""
+        response = client.get('/api/games', query_string={
+            'sort_by': sort_by, 'after_value': after_value, 'after_id': 'g2',
+        })
+
+        assert response.status_code == 400
+        mock_get_games.assert_not_called()
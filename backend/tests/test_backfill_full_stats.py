@@ -4,18 +4,17 @@ Tests for full backfill CLI control flow.
 These tests mock DB interactions to ensure we reset, then process games, and honor flags.
 """
 
-import os
 import sys
 
 import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import cli.backfill_full_stats as backfill  # noqa: E402
+import cli.backfill_full_stats as backfill
 
 
 def run_main(monkeypatch, argv, calls, stream_ids):
     monkeypatch.setattr(sys, "argv", argv)
     monkeypatch.setattr(backfill, "load_dotenv", lambda: None)
+    monkeypatch.setattr(backfill, "ensure_replay_indexes", lambda: None)
     monkeypatch.setattr(backfill, "reset_models_to_baseline", lambda: calls.append("reset"))
     monkeypatch.setattr(
         backfill,
@@ -24,13 +23,8 @@ def run_main(monkeypatch, argv, calls, stream_ids):
     )
     monkeypatch.setattr(
         backfill,
-        "update_model_aggregates",
-        lambda gid: calls.append(("aggregates", gid)),
-    )
-    monkeypatch.setattr(
-        backfill,
-        "update_trueskill_ratings",
-        lambda gid: calls.append(("trueskill", gid)),
+        "update_aggregates_and_trueskill_batch",
+        lambda gids: calls.append(("batch", list(gids))),
     )
     backfill.main()
 
@@ -40,8 +34,14 @@ def test_default_runs_reset_and_updates(monkeypatch):
     run_main(monkeypatch, ["backfill_full_stats.py"], calls, ["g1", "g2"])
 
     assert "reset" in calls
-    assert ("aggregates", "g1") in calls and ("trueskill", "g1") in calls
-    assert ("aggregates", "g2") in calls and ("trueskill", "g2") in calls
+    assert ("batch", ["g1", "g2"]) in calls
+
+
+def test_games_are_replayed_in_batch_size_chunks(monkeypatch):
+    calls = []
+    run_main(monkeypatch, ["backfill_full_stats.py", "--batch-size", "2"], calls, ["g1", "g2", "g3"])
+
+    assert [c for c in calls if c != "reset"] == [("batch", ["g1", "g2"]), ("batch", ["g3"])]
 
 
 def test_no_reset_skips_reset(monkeypatch):
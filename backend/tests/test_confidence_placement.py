@@ -8,18 +8,20 @@ Tests both the prototype implementation and the production placement_system.
 import math
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional, Set
-import sys
-import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pytest
 
 # Import the production system for testing
+import placement_system
+from services.trueskill_engine import DEFAULT_MU as TS_DEFAULT_MU, DEFAULT_SIGMA as TS_DEFAULT_SIGMA
 from placement_system import (
     init_placement_state,
     select_next_opponent,
     update_placement_state,
     rebuild_state_from_history,
     PlacementState,
+    build_opponent_context,
     get_final_rank,
     format_state_summary,
 )
@@ -788,63 +790,42 @@ def test_information_gain_opponent_selection():
     print("  Expected: Should target higher ELO now (since we won)")
 
 
-def test_rematch_logic():
+@pytest.mark.parametrize(
+    "my_score, opponent_score, death_reason, expect_rematch",
+    [
+        (5, 5, 'body_collision', True),   # close loss (diff=0) -> rematch
+        (1, 10, 'wall', False),           # decisive loss (diff=9) -> no rematch
+    ],
+    ids=["close_loss", "decisive_loss"],
+)
+def test_rematch_logic(monkeypatch, my_score, opponent_score, death_reason, expect_rematch):
     """
-    Test that rematch is triggered for fluky losses.
+    Test that rematch is triggered for fluky losses only.
     """
-    print("\n" + "=" * 80)
-    print("TEST: Rematch Logic")
-    print("=" * 80)
-
-    ranked_models = [
-        {'id': i, 'name': f"Model_{i}", 'rating': 1700 - i * 10, 'rank_index': i,
-         'pricing_input': None, 'pricing_output': None, 'provider': None}
-        for i in range(50)
-    ]
+    # Bookkeeping only; keep mu/sigma reads off the database
+    monkeypatch.setattr(
+        placement_system,
+        "_read_model_trueskill",
+        lambda model_id, conn=None: (TS_DEFAULT_MU, TS_DEFAULT_SIGMA),
+    )
 
     state = init_placement_state(model_id=9999, max_games=9)
 
-    # Simulate a close loss (score diff <= 1, should trigger rematch)
-    close_loss = {
+    loss = {
         'opponent_id': 20,
         'result': 'lost',
-        'my_score': 5,
-        'opponent_score': 5,  # Tie score but lost
-        'my_death_reason': 'body_collision',
+        'my_score': my_score,
+        'opponent_score': opponent_score,
+        'my_death_reason': death_reason,
         'total_rounds': 25
     }
 
-    print(f"Close loss: Score 5-5, body_collision (diff=0)")
-
-    update_placement_state(state, close_loss, 1500)
-
-    if state.pending_rematch:
-        print(f"REMATCH REQUESTED: opponent {state.pending_rematch}")
-        print("  -> Correct! Close loss (diff<=1) triggered rematch")
-    else:
-        print("No rematch requested")
-
-    # Now simulate a decisive loss (score diff > 1, no rematch)
-    state2 = init_placement_state(model_id=9998, max_games=9)
-
-    decisive_loss = {
-        'opponent_id': 20,
-        'result': 'lost',
-        'my_score': 1,
-        'opponent_score': 10,
-        'my_death_reason': 'wall',
-        'total_rounds': 15
-    }
-
-    print(f"\nDecisive loss: Score 1-10, wall death (diff=9)")
-
-    update_placement_state(state2, decisive_loss, 1500)
+    update_placement_state(state, loss, 1500)
 
-    if state2.pending_rematch:
-        print(f"REMATCH REQUESTED: opponent {state2.pending_rematch}")
+    if expect_rematch:
+        assert state.pending_rematch == 20
     else:
-        print("No rematch requested")
-        print("  -> Correct! Decisive loss should not trigger rematch")
+        assert state.pending_rematch is None
 
 
 # =============================================================================
@@ -888,6 +869,33 @@ class TestIntervalAwarePlacement:
         assert opponent is not None
         assert opponent['id'] == 4  # Low
 
+    def test_opponent_context_keeps_rank_order(self):
+        """
+        The prepared context must keep the leaderboard in rank order: cohort
+        medians are read by index and assume descending ratings.
+        """
+        ranked_models = self._ranked_models()
+        context = build_opponent_context(ranked_models)
+
+        assert np.all(np.diff(context.ratings) <= 0)
+        assert context.index_by_id == {m['id']: m['rank_index'] for m in ranked_models}
+        assert context.frontier.tolist() == [True, True, True, False]
+        assert context.overall_median == 1600.0  # upper median of an even-length list
+
+    def test_opponent_context_sorts_unordered_input(self):
+        """
+        An out-of-order list is re-sorted by rating, so the overall and cohort
+        medians match the ones from the rank-ordered list.
+        """
+        ranked_models = self._ranked_models()
+        shuffled = [ranked_models[i] for i in (2, 0, 3, 1)]
+        context = build_opponent_context(shuffled)
+
+        assert np.all(np.diff(context.ratings) <= 0)
+        assert [m['id'] for m in context.ranked_models] == [m['id'] for m in ranked_models]
+        assert context.index_by_id == {m['id']: m['rank_index'] for m in ranked_models}
+        assert context.overall_median == build_opponent_context(ranked_models).overall_median
+
     def test_draw_bookkeeping_only(self):
         """
         A draw should update bookkeeping but not crash (no interval logic).
@@ -911,8 +919,26 @@ class TestIntervalAwarePlacement:
         assert 123 in state.opponents_played
 
 
+@pytest.mark.parametrize("sigma", [0.0, 2.5, TS_DEFAULT_SIGMA])
+def test_information_gain_scalar_matches_array(sigma):
+    """The single-opponent and vectorized information gain agree, sigma == 0 included."""
+    mu = 25.0
+    ratings = np.array([25.0, 26.5, 60.0, 80.0, -10.0])
+    play_counts = np.array([0, 1, 0, 2, 3])
+
+    gains = placement_system.calculate_information_gain_array(mu, sigma, ratings, play_counts)
+    expected = [
+        placement_system.calculate_information_gain(mu, sigma, float(r), i, int(c))
+        for i, (r, c) in enumerate(zip(ratings, play_counts))
+    ]
+
+    assert gains.tolist() == pytest.approx(expected)
+    if sigma == 0:
+        # Step distance factor (within 50 of mu) times repeat penalty, no uncertainty bonus
+        assert gains.tolist() == pytest.approx([0.5, 0.05, 0.5, 0.0, 0.0005])
+
+
 if __name__ == "__main__":
     test_with_actual_match_history()
     test_production_system()
     test_information_gain_opponent_selection()
-    test_rematch_logic()
@@ -6,24 +6,27 @@ without requiring an actual database.
 """
 
 import pytest
-import sys
-import os
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
-# Add backend to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# All tests now mock at the repository's base level (database_postgres.get_pool)
+# since the wrapper functions now delegate to repositories
 
 
-# All tests now mock at the repository's base level (database_postgres.get_connection)
-# since the wrapper functions now delegate to repositories
+@pytest.fixture(autouse=True)
+def clear_models_cache(monkeypatch):
+    """Model reads and the games count are cached per process; start every test cold."""
+    from data_access import api_queries
+    from data_access.cache import invalidate_models_cache
+    invalidate_models_cache()
+    monkeypatch.setattr(api_queries, '_games_count_cache', None)
 
 
 class TestApiQueries:
     """Tests for api_queries.py functions."""
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_all_models_returns_list(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_all_models_returns_list(self, mock_get_pool):
         """get_all_models returns a list of model dictionaries."""
         from data_access.api_queries import get_all_models
 
@@ -53,7 +56,7 @@ class TestApiQueries:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_all_models()
 
@@ -64,10 +67,10 @@ class TestApiQueries:
         # Verify nested pricing dict is created
         assert 'pricing' in result[0]
         assert result[0]['pricing']['input'] == 0.001
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_all_models_active_only(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_all_models_active_only(self, mock_get_pool):
         """get_all_models with active_only=True filters inactive models."""
         from data_access.api_queries import get_all_models
 
@@ -75,7 +78,7 @@ class TestApiQueries:
         mock_cursor.fetchall.return_value = []
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         get_all_models(active_only=True)
 
@@ -83,10 +86,10 @@ class TestApiQueries:
         call_args = mock_cursor.execute.call_args
         query = call_args[0][0]
         assert 'is_active = TRUE' in query
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_model_by_name_found(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_model_by_name_found(self, mock_get_pool):
         """get_model_by_name returns model when found."""
         from data_access.api_queries import get_model_by_name
 
@@ -113,17 +116,17 @@ class TestApiQueries:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_model_by_name('test-model')
 
         assert result is not None
         assert result['name'] == 'test-model'
         assert result['elo_rating'] == 1600.0
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_model_by_name_not_found(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_model_by_name_not_found(self, mock_get_pool):
         """get_model_by_name returns None when model not found."""
         from data_access.api_queries import get_model_by_name
 
@@ -132,60 +135,164 @@ class TestApiQueries:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_model_by_name('nonexistent-model')
 
         assert result is None
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_model_by_name_is_cached_until_invalidated(self, mock_get_pool):
+        """Repeat lookups are served from the cache as independent copies."""
+        from data_access.api_queries import get_model_by_name
+        from data_access.cache import invalidate_models_cache
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {
+            'id': 1, 'name': 'test-model', 'provider': 'openrouter',
+            'model_slug': 'test/model', 'is_active': True, 'test_status': 'ranked',
+            'elo_rating': 1600.0, 'wins': 0, 'losses': 0, 'ties': 0,
+            'apples_eaten': 0, 'games_played': 0, 'pricing_input': None,
+            'pricing_output': None, 'max_completion_tokens': None,
+            'last_played_at': None, 'discovered_at': None
+        }
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        first = get_model_by_name('test-model')
+        first['elo_rating'] = 0
+        second = get_model_by_name('test-model')
+
+        assert mock_get_pool.return_value.getconn.call_count == 1
+        assert second['elo_rating'] == 1600.0
+
+        invalidate_models_cache()
+        get_model_by_name('test-model')
+        assert mock_get_pool.return_value.getconn.call_count == 2
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_model_repository_write_invalidates_cache(self, mock_get_pool):
+        """A committed write through ModelRepository drops cached model reads."""
+        from data_access.api_queries import get_model_by_name
+        from data_access.repositories import ModelRepository
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = {
+            'id': 1, 'name': 'test-model', 'provider': 'openrouter',
+            'model_slug': 'test/model', 'is_active': True, 'test_status': 'ranked',
+            'elo_rating': 1600.0, 'wins': 0, 'losses': 0, 'ties': 0,
+            'apples_eaten': 0, 'games_played': 0, 'pricing_input': None,
+            'pricing_output': None, 'max_completion_tokens': None,
+            'last_played_at': None, 'discovered_at': None
+        }
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        get_model_by_name('test-model')
+        ModelRepository().update_test_status(1, 'ranked')
+        get_model_by_name('test-model')
+
+        # read, write, and a second read that missed the cache
+        assert mock_get_pool.return_value.getconn.call_count == 3
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_models_by_ids_single_query(self, mock_get_pool):
+        """get_models_by_ids loads all requested models in one query, keyed by id."""
+        from data_access.api_queries import get_models_by_ids
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {
+                'id': model_id,
+                'name': f'model-{model_id}',
+                'provider': 'openrouter',
+                'model_slug': f'test/model-{model_id}',
+                'is_active': True,
+                'test_status': 'ranked',
+                'elo_rating': 1500.0,
+                'wins': 0,
+                'losses': 0,
+                'ties': 0,
+                'apples_eaten': 0,
+                'games_played': 0,
+                'pricing_input': None,
+                'pricing_output': None,
+                'max_completion_tokens': 4096,
+                'last_played_at': None,
+                'discovered_at': '2024-01-01T00:00:00'
+            }
+            for model_id in (3, 7)
+        ]
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_games_returns_paginated_list(self, mock_get_conn):
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        result = get_models_by_ids([3, 7, 9])
+
+        mock_cursor.execute.assert_called_once()
+        query, params = mock_cursor.execute.call_args[0]
+        assert 'ANY(%s)' in query
+        assert params == ([3, 7, 9],)
+        assert set(result) == {3, 7}
+        assert result[7]['name'] == 'model-7'
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_models_by_ids_empty(self, mock_get_pool):
+        """get_models_by_ids skips the database for an empty id list."""
+        from data_access.api_queries import get_models_by_ids
+
+        assert get_models_by_ids([]) == {}
+        mock_get_pool.return_value.getconn.assert_not_called()
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_games_returns_paginated_list(self, mock_get_pool):
         """get_games returns paginated list of games."""
         from data_access.api_queries import get_games
 
         mock_cursor = MagicMock()
-        # First call returns games, second call returns participants
-        mock_cursor.fetchall.side_effect = [
-            [
-                {
-                    'id': 'game-123',
-                    'start_time': datetime(2024, 1, 1, 12, 0, 0),
-                    'end_time': datetime(2024, 1, 1, 12, 5, 0),
-                    'rounds': 50,
-                    'replay_path': '/replays/game-123.json',
-                    'board_width': 10,
-                    'board_height': 10,
-                    'num_apples': 5,
-                    'total_score': 15,
-                    'created_at': datetime(2024, 1, 1, 12, 0, 0)
-                }
-            ],
-            [
-                {
-                    'name': 'model-1',
-                    'provider': 'openrouter',
-                    'player_slot': 0,
-                    'score': 8,
-                    'result': 'won',
-                    'death_round': None,
-                    'death_reason': None
-                },
-                {
-                    'name': 'model-2',
-                    'provider': 'openrouter',
-                    'player_slot': 1,
-                    'score': 7,
-                    'result': 'lost',
-                    'death_round': 45,
-                    'death_reason': 'wall'
-                }
-            ]
+        # Participants arrive already nested (jsonb_agg decoded by psycopg2)
+        mock_cursor.fetchall.return_value = [
+            {
+                'id': 'game-123',
+                'start_time': datetime(2024, 1, 1, 12, 0, 0),
+                'end_time': datetime(2024, 1, 1, 12, 5, 0),
+                'rounds': 50,
+                'replay_path': '/replays/game-123.json',
+                'board_width': 10,
+                'board_height': 10,
+                'num_apples': 5,
+                'total_score': 15,
+                'created_at': datetime(2024, 1, 1, 12, 0, 0),
+                'participants': [
+                    {
+                        'model_name': 'model-1',
+                        'provider': 'openrouter',
+                        'player_slot': 0,
+                        'score': 8,
+                        'result': 'won',
+                        'death_round': None,
+                        'death_reason': None
+                    },
+                    {
+                        'model_name': 'model-2',
+                        'provider': 'openrouter',
+                        'player_slot': 1,
+                        'score': 7,
+                        'result': 'lost',
+                        'death_round': 45,
+                        'death_reason': 'wall'
+                    }
+                ]
+            }
         ]
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_games(limit=10, offset=0)
 
@@ -193,10 +300,88 @@ class TestApiQueries:
         assert len(result) == 1
         assert result[0]['id'] == 'game-123'
         assert len(result[0]['participants']) == 2
-        mock_conn.close.assert_called_once()
+        # The page and its participants come back from a single query
+        assert mock_cursor.execute.call_count == 1
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_games_keyset_cursor(self, mock_get_pool):
+        """get_games seeks past the cursor instead of using an offset."""
+        from data_access.api_queries import get_games
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_total_games_count(self, mock_get_conn):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        result = get_games(limit=5, offset=40, sort_by='rounds', after=(30, 'game-9'))
+
+        assert result == []
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "(g.rounds, g.id) < (%s, %s)" in sql
+        assert "ORDER BY g.rounds DESC, g.id DESC" in sql
+        assert params == (30, 'game-9', 5, 0)
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_game_by_id_single_query(self, mock_get_pool):
+        """get_game_by_id builds the game and its participants from one joined query."""
+        from data_access.api_queries import get_game_by_id
+
+        game_columns = {
+            'id': 'game-123',
+            'status': 'completed',
+            'start_time': datetime(2024, 1, 1, 12, 0, 0),
+            'end_time': datetime(2024, 1, 1, 12, 5, 0),
+            'rounds': 50,
+            'replay_path': '/replays/game-123.json',
+            'board_width': 10,
+            'board_height': 10,
+            'num_apples': 5,
+            'total_score': 15,
+            'total_cost': 0.01,
+            'current_state': None,
+            'created_at': datetime(2024, 1, 1, 12, 0, 0)
+        }
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {**game_columns, 'p_name': 'model-1', 'p_provider': 'openrouter',
+             'player_slot': 0, 'score': 8, 'result': 'won',
+             'death_round': None, 'death_reason': None},
+            {**game_columns, 'p_name': 'model-2', 'p_provider': 'openrouter',
+             'player_slot': 1, 'score': 7, 'result': 'lost',
+             'death_round': 45, 'death_reason': 'wall'}
+        ]
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        result = get_game_by_id('game-123')
+
+        assert result['id'] == 'game-123'
+        assert [p['model_name'] for p in result['participants']] == ['model-1', 'model-2']
+        assert result['participants'][0]['provider'] == 'openrouter'
+        assert mock_cursor.execute.call_count == 1
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_game_by_id_not_found(self, mock_get_pool):
+        """get_game_by_id returns None when the join yields no rows."""
+        from data_access.api_queries import get_game_by_id
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        assert get_game_by_id('missing') is None
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_total_games_count(self, mock_get_pool):
         """get_total_games_count returns correct count."""
         from data_access.api_queries import get_total_games_count
 
@@ -205,26 +390,30 @@ class TestApiQueries:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_total_games_count()
 
         assert result == 42
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+        # A repeat call within the cache period doesn't query again
+        assert get_total_games_count() == 42
+        assert mock_get_pool.return_value.getconn.call_count == 1
 
 
 class TestGamePersistence:
     """Tests for game_persistence.py functions."""
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_insert_game_success(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_game_success(self, mock_get_pool):
         """insert_game successfully inserts a game record."""
         from data_access.game_persistence import insert_game
 
         mock_cursor = MagicMock()
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         insert_game(
             game_id='test-game-123',
@@ -241,24 +430,23 @@ class TestGamePersistence:
 
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_insert_game_participants_success(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_game_participants_success(self, mock_get_pool):
         """insert_game_participants inserts participant records."""
         from data_access.game_persistence import insert_game_participants
 
         mock_cursor = MagicMock()
-        # First fetchone returns model_id for first participant
-        # Second fetchone returns model_id for second participant
-        mock_cursor.fetchone.side_effect = [
-            {'id': 1},
-            {'id': 2}
+        # RETURNING yields the slot of every participant that was inserted
+        mock_cursor.fetchall.return_value = [
+            {'player_slot': 0},
+            {'player_slot': 1}
         ]
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         participants = [
             {
@@ -283,23 +471,27 @@ class TestGamePersistence:
 
         insert_game_participants('test-game-123', participants)
 
-        # Should have 2 SELECT calls (to get model_id) + 2 INSERT calls
-        assert mock_cursor.execute.call_count == 4
+        # A single batched INSERT ... SELECT for both participants
+        mock_cursor.execute.assert_called_once()
+        params = mock_cursor.execute.call_args[0][1]
+        assert params[0] == 'test-game-123'
+        assert params[1] == ['model-1', 'model-2']
+        assert params[5] == [None, 45]
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_insert_game_participants_model_not_found(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_game_participants_model_not_found(self, mock_get_pool):
         """insert_game_participants skips participants with unknown models."""
         from data_access.game_persistence import insert_game_participants
 
         mock_cursor = MagicMock()
-        # Model not found
-        mock_cursor.fetchone.return_value = None
+        # Model not found: the name join produces no row to insert
+        mock_cursor.fetchall.return_value = []
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         participants = [
             {
@@ -313,10 +505,37 @@ class TestGamePersistence:
         # Should not raise, just skip
         insert_game_participants('test-game-123', participants)
 
-        # Only 1 SELECT call, no INSERT
-        assert mock_cursor.execute.call_count == 1
+        # Still one statement; the unresolved participant is just reported
+        mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_game_participants_dedupes_slots(self, mock_get_pool):
+        """A repeated player_slot is sent once, with the last entry for it."""
+        from data_access.game_persistence import insert_game_participants
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [{'player_slot': 0}, {'player_slot': 1}]
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        participants = [
+            {'model_name': 'model-1', 'player_slot': 0, 'score': 3, 'result': 'tied'},
+            {'model_name': 'model-2', 'player_slot': 1, 'score': 7, 'result': 'lost'},
+            {'model_name': 'model-1', 'player_slot': 0, 'score': 8, 'result': 'won'},
+        ]
+
+        insert_game_participants('test-game-123', participants)
+
+        mock_cursor.execute.assert_called_once()
+        params = mock_cursor.execute.call_args[0][1]
+        assert params[1] == ['model-1', 'model-2']
+        assert params[2] == [0, 1]
+        assert params[3] == [8, 7]
+        assert params[4] == ['won', 'lost']
 
 
 class TestModelUpdates:
@@ -366,8 +585,8 @@ class TestModelUpdates:
         result = expected_score(1400, 1600)
         assert result < 0.5
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_update_elo_ratings_two_players(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_update_elo_ratings_two_players(self, mock_get_pool):
         """update_elo_ratings calculates and updates ELO for both players."""
         from data_access.model_updates import update_elo_ratings
 
@@ -380,14 +599,14 @@ class TestModelUpdates:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         update_elo_ratings('test-game-123')
 
         # Should have 1 SELECT + 2 UPDATE calls
         assert mock_cursor.execute.call_count == 3
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
         # Verify the UPDATE calls have correct ELO changes
         # Winner should gain rating, loser should lose rating
@@ -395,41 +614,75 @@ class TestModelUpdates:
                        if 'UPDATE models' in str(call)]
         assert len(update_calls) == 2
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_update_model_aggregates(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_update_model_aggregates(self, mock_get_pool):
         """update_model_aggregates updates win/loss/tie counts."""
         from data_access.model_updates import update_model_aggregates
 
         mock_cursor = MagicMock()
         mock_cursor.fetchall.return_value = [
-            {'model_id': 1, 'result': 'won', 'score': 10, 'name': 'winner'},
-            {'model_id': 2, 'result': 'lost', 'score': 5, 'name': 'loser'}
+            {'name': 'winner', 'apples_eaten': 10, 'results': 'won'},
+            {'name': 'loser', 'apples_eaten': 5, 'results': 'lost'}
         ]
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         update_model_aggregates('test-game-123')
 
-        # Should have 1 SELECT + 2 UPDATE calls
-        assert mock_cursor.execute.call_count == 3
+        # A single UPDATE covers every participant
+        assert mock_cursor.execute.call_count == 1
+        query, params = mock_cursor.execute.call_args[0]
+        assert 'GROUP BY model_id' in query
+        assert params[1] == 'test-game-123'
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
+
+    @patch('data_access.repositories.model_repository.execute_values')
+    @patch('data_access.repositories.base.get_pool')
+    def test_update_aggregates_and_trueskill_batch_records_history(self, mock_get_pool, mock_execute_values):
+        """The batched path writes model_rating_history rows like the per-game path."""
+        from data_access.model_updates import _model_repo, update_aggregates_and_trueskill_batch
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {'game_id': 'g1', 'model_id': 1, 'score': 5, 'result': 'won',
+             'model_name': 'winner', 'trueskill_mu': 25.0, 'trueskill_sigma': 8.333},
+            {'game_id': 'g1', 'model_id': 2, 'score': 2, 'result': 'lost',
+             'model_name': 'loser', 'trueskill_mu': 25.0, 'trueskill_sigma': 8.333},
+        ]
+        mock_cursor.fetchone.return_value = {'reg': 'model_rating_history'}
+
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_get_pool.return_value.getconn.return_value = mock_conn
+
+        with patch.object(_model_repo, '_has_rating_history', None):
+            update_aggregates_and_trueskill_batch(['g1'])
+
+        history_calls = [call for call in mock_execute_values.call_args_list
+                         if 'INSERT INTO model_rating_history' in call[0][1]]
+        assert len(history_calls) == 1
+        rows = history_calls[0][0][2]
+        assert [(row[0], row[1]) for row in rows] == [('g1', 1), ('g1', 2)]
+        # Winner's post-game mu rises, loser's falls
+        assert rows[0][4] > rows[0][2]
+        assert rows[1][4] < rows[1][2]
 
 
 class TestLiveGame:
     """Tests for live_game.py functions."""
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_insert_initial_game(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_initial_game(self, mock_get_pool):
         """insert_initial_game creates initial game record."""
         from data_access.live_game import insert_initial_game
 
         mock_cursor = MagicMock()
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         insert_initial_game(
             game_id='test-game-123',
@@ -441,19 +694,19 @@ class TestLiveGame:
 
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_insert_initial_participants(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_insert_initial_participants(self, mock_get_pool):
         """insert_initial_participants creates placeholder participant records."""
         from data_access.live_game import insert_initial_participants
 
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.side_effect = [{'id': 1}, {'id': 2}]
+        mock_cursor.fetchall.return_value = [{'player_slot': 0}, {'player_slot': 1}]
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         participants = [
             {'model_name': 'model-1', 'player_slot': 0},
@@ -462,20 +715,23 @@ class TestLiveGame:
 
         insert_initial_participants('test-game-123', participants)
 
-        # 2 SELECT + 2 INSERT
-        assert mock_cursor.execute.call_count == 4
+        # One batched INSERT ... SELECT resolving model names in SQL
+        mock_cursor.execute.assert_called_once()
+        params = mock_cursor.execute.call_args[0][1]
+        assert params[1] == ['model-1', 'model-2']
+        assert params[2] == [0, 1]
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_update_game_state(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_update_game_state(self, mock_get_pool):
         """update_game_state updates current_state JSON."""
         from data_access.live_game import update_game_state
 
         mock_cursor = MagicMock()
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         current_state = {
             'round_number': 10,
@@ -487,17 +743,17 @@ class TestLiveGame:
 
         mock_cursor.execute.assert_called_once()
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_complete_game(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_complete_game(self, mock_get_pool):
         """complete_game marks game as completed."""
         from data_access.live_game import complete_game
 
         mock_cursor = MagicMock()
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         complete_game(
             game_id='test-game-123',
@@ -513,10 +769,10 @@ class TestLiveGame:
         query = mock_cursor.execute.call_args[0][0]
         assert "status = 'completed'" in query
         mock_conn.commit.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_live_games(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_live_games(self, mock_get_pool):
         """get_live_games returns in-progress games."""
         from data_access.live_game import get_live_games
 
@@ -544,7 +800,7 @@ class TestLiveGame:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_live_games()
 
@@ -553,10 +809,10 @@ class TestLiveGame:
         assert result[0]['id'] == 'game-123'
         assert result[0]['status'] == 'in_progress'
         assert result[0]['models'] == {'0': 'model-1', '1': 'model-2'}
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_game_state_found(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_game_state_found(self, mock_get_pool):
         """get_game_state returns game state when found."""
         from data_access.live_game import get_game_state
 
@@ -580,17 +836,17 @@ class TestLiveGame:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_game_state('game-123')
 
         assert result is not None
         assert result['id'] == 'game-123'
         assert result['current_state'] == {'round_number': 10}
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_get_game_state_not_found(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_get_game_state_not_found(self, mock_get_pool):
         """get_game_state returns None when game not found."""
         from data_access.live_game import get_game_state
 
@@ -599,51 +855,51 @@ class TestLiveGame:
 
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         result = get_game_state('nonexistent-game')
 
         assert result is None
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
 
 class TestConnectionManagement:
     """Tests to verify connection management patterns."""
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_connection_closed_on_success(self, mock_get_conn):
-        """Connection is closed after successful operation."""
+    @patch('data_access.repositories.base.get_pool')
+    def test_connection_returned_on_success(self, mock_get_pool):
+        """Connection is returned to the pool after successful operation."""
         from data_access.api_queries import get_all_models
 
         mock_cursor = MagicMock()
         mock_cursor.fetchall.return_value = []
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         get_all_models()
 
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_connection_closed_on_exception(self, mock_get_conn):
-        """Connection is closed even when exception occurs."""
+    @patch('data_access.repositories.base.get_pool')
+    def test_connection_returned_on_exception(self, mock_get_pool):
+        """Connection is returned to the pool even when exception occurs."""
         from data_access.api_queries import get_all_models
 
         mock_cursor = MagicMock()
         mock_cursor.fetchall.side_effect = Exception("Database error")
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         with pytest.raises(Exception):
             get_all_models()
 
-        # Connection should still be closed
-        mock_conn.close.assert_called_once()
+        # Connection should still be returned
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
 
-    @patch('data_access.repositories.base.get_connection')
-    def test_rollback_on_insert_error(self, mock_get_conn):
+    @patch('data_access.repositories.base.get_pool')
+    def test_rollback_on_insert_error(self, mock_get_pool):
         """Transaction is rolled back on insert error."""
         from data_access.game_persistence import insert_game
 
@@ -651,7 +907,7 @@ class TestConnectionManagement:
         mock_cursor.execute.side_effect = Exception("Insert failed")
         mock_conn = MagicMock()
         mock_conn.cursor.return_value = mock_cursor
-        mock_get_conn.return_value = mock_conn
+        mock_get_pool.return_value.getconn.return_value = mock_conn
 
         with pytest.raises(Exception):
             insert_game(
@@ -667,4 +923,4 @@ class TestConnectionManagement:
             )
 
         mock_conn.rollback.assert_called_once()
-        mock_conn.close.assert_called_once()
+        mock_get_pool.return_value.putconn.assert_called_once_with(mock_conn)
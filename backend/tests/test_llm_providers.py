@@ -4,16 +4,12 @@ Tests for LLM provider request construction.
 Ensures database-only metadata fields aren't forwarded to the OpenAI client.
 """
 
-import os
-import sys
 from types import SimpleNamespace
 
 import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-import llm_providers  # noqa: E402
-from llm_providers import OpenRouterProvider, OpenAIProvider  # noqa: E402
+import llm_providers
+from llm_providers import OpenRouterProvider, OpenAIProvider
 
 
 class DummyCompletions:
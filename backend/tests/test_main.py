@@ -6,16 +6,12 @@ refactoring doesn't break existing functionality.
 """
 
 import pytest
-import sys
 import os
 from collections import deque
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 import json
 
-# Add backend to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from main import (
     Snake,
     GameState,
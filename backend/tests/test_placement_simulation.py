@@ -9,14 +9,10 @@ Uses real ELO distribution from the database to simulate realistic scenarios.
 """
 
 import pytest
-import sys
-import os
 from dataclasses import dataclass
 from typing import List, Tuple, Optional, Set
 from copy import deepcopy
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from database_postgres import get_connection
 from data_access.repositories.model_repository import K, expected_score
 
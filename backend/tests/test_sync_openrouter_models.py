@@ -0,0 +1,112 @@
+"""
+Tests for cli/sync_openrouter_models.py.
+
+Covers catalog normalization and validation, and that sync_models hands
+upsert_models one row per slug. The database and OpenRouter are mocked.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from cli.sync_openrouter_models import (
+    normalize_model_data,
+    sync_models,
+    validate_model_data,
+)
+
+
+def _catalog_entry(model_id='openai/gpt-test', **overrides):
+    entry = {
+        'id': model_id,
+        'name': 'GPT Test',
+        'pricing': {'prompt': '0.000001', 'completion': '0.000002'},
+        'context_length': 128000,
+        'top_provider': {'max_completion_tokens': 4096},
+    }
+    entry.update(overrides)
+    return entry
+
+
+class TestNormalizeModelData:
+    """Tests for normalize_model_data."""
+
+    def test_normalizes_catalog_entry(self):
+        """Prices become dollars per million tokens and the provider comes from the id."""
+        normalized = normalize_model_data(_catalog_entry())
+
+        assert normalized['model_slug'] == 'openai/gpt-test'
+        assert normalized['name'] == 'GPT Test'
+        assert normalized['provider'] == 'openai'
+        assert normalized['pricing_input'] == pytest.approx(1.0)
+        assert normalized['pricing_output'] == pytest.approx(2.0)
+        assert normalized['max_completion_tokens'] == 4096
+        assert normalized['metadata_json']['context_length'] == 128000
+
+    def test_defaults_for_sparse_entry(self):
+        """Missing name, prices and provider prefix fall back to defaults."""
+        normalized = normalize_model_data({'id': 'bare-model', 'context_length': 8192})
+
+        assert normalized['name'] == 'bare-model'
+        assert normalized['provider'] == 'unknown'
+        assert normalized['pricing_input'] is None
+        assert normalized['pricing_output'] is None
+        assert normalized['max_completion_tokens'] == 8192
+
+
+class TestValidateModelData:
+    """Tests for validate_model_data."""
+
+    def test_valid_model_passes(self):
+        assert validate_model_data(normalize_model_data(_catalog_entry())) is None
+
+    def test_integral_float_token_limit_is_coerced(self):
+        model = normalize_model_data(_catalog_entry(top_provider={'max_completion_tokens': 4096.0}))
+
+        assert validate_model_data(model) is None
+        assert model['max_completion_tokens'] == 4096
+        assert isinstance(model['max_completion_tokens'], int)
+
+    @pytest.mark.parametrize('overrides', [
+        {'id': ''},
+        {'name': ''},
+        {'top_provider': {'max_completion_tokens': 'lots'}},
+        {'top_provider': {'max_completion_tokens': 4096.5}},
+        {'pricing': {'prompt': 'inf'}},
+        {'pricing': {'completion': 'nan'}},
+    ])
+    def test_invalid_model_rejected(self, overrides):
+        model = normalize_model_data(_catalog_entry(**overrides))
+
+        assert validate_model_data(model) is not None
+
+
+class TestSyncModels:
+    """Tests for sync_models."""
+
+    @patch('cli.sync_openrouter_models.invalidate_models_cache')
+    @patch('cli.sync_openrouter_models.ensure_model_slug_index')
+    @patch('cli.sync_openrouter_models.get_connection')
+    @patch('cli.sync_openrouter_models.upsert_models')
+    @patch('cli.sync_openrouter_models.fetch_openrouter_models')
+    def test_duplicate_slugs_keep_last_entry(
+        self, mock_fetch, mock_upsert, mock_get_connection, mock_ensure_index, mock_invalidate
+    ):
+        """A slug repeated in the catalog is upserted once, with its last entry."""
+        mock_fetch.return_value = ([
+            _catalog_entry(name='First'),
+            _catalog_entry('anthropic/other', name='Other'),
+            _catalog_entry(name='Second'),
+        ], {})
+        mock_upsert.return_value = {
+            'openai/gpt-test': (1, 'unchanged'),
+            'anthropic/other': (2, 'unchanged'),
+        }
+        mock_get_connection.return_value = MagicMock()
+
+        stats = sync_models(api_key='test-key')
+
+        upserted = mock_upsert.call_args[0][0]
+        assert [m['model_slug'] for m in upserted] == ['openai/gpt-test', 'anthropic/other']
+        assert upserted[0]['name'] == 'Second'
+        assert stats['unchanged'] == 2
+        assert stats['skipped'] == 1
@@ -1,10 +1,5 @@
-import os
-import sys
 from unittest.mock import MagicMock
 
-# Add backend to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from services.trueskill_engine import (
     TrueSkillEngine,
     DEFAULT_MU,
@@ -44,6 +39,8 @@ def test_rate_game_updates_repository():
     mock_repo.update_trueskill_batch.assert_called_once()
 
     applied_updates = mock_repo.update_trueskill_batch.call_args[0][0]
+    # The game id is passed through so rating history can be recorded
+    assert mock_repo.update_trueskill_batch.call_args.kwargs == {"game_id": "game-1"}
     assert len(applied_updates) == 2
     assert updates == applied_updates
 
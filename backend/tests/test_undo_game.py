@@ -5,39 +5,77 @@ These tests mock out DB-heavy functions to ensure the control flow chooses
 the fast path by default and only runs the full replay when requested.
 """
 
-import os
 import sys
 from types import SimpleNamespace
 
 import pytest
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import cli.undo_game as undo_game  # noqa: E402
+import cli.undo_game as undo_game
 
 
-def run_main(monkeypatch, argv, calls):
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commits += 1
+        else:
+            self.rollbacks += 1
+        return False
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+        self.borrowed = 0
+        self.returned = 0
+
+    def getconn(self):
+        self.borrowed += 1
+        return self.conn
+
+    def putconn(self, conn):
+        assert conn is self.conn
+        self.returned += 1
+
+
+def run_main(monkeypatch, argv, calls, pool=None, exists=True):
+    pool = pool or FakePool()
     monkeypatch.setattr(sys, "argv", argv)
     monkeypatch.setattr(undo_game, "load_dotenv", lambda: None)
-    monkeypatch.setattr(undo_game, "game_exists", lambda gid: True)
+    monkeypatch.setattr(undo_game, "get_pool", lambda: pool)
+    monkeypatch.setattr(undo_game, "ensure_game_participants_game_id_index", lambda: None)
+    monkeypatch.setattr(undo_game, "ensure_replay_indexes", lambda: None)
+    monkeypatch.setattr(undo_game, "game_exists", lambda conn, gid: exists)
+    monkeypatch.setattr(
+        undo_game,
+        "revert_game_ratings",
+        lambda conn, gid: (calls.append(("revert", gid)) or False),
+    )
     monkeypatch.setattr(
         undo_game,
         "delete_game_and_participants",
-        lambda gid: calls.append(("delete", gid)),
+        lambda conn, gid: (calls.append(("delete", gid)) or exists),
     )
     monkeypatch.setattr(
         undo_game,
         "recompute_aggregates_all_models",
-        lambda: calls.append(("recompute_aggregates", None)),
+        lambda conn: calls.append(("recompute_aggregates", None)),
     )
     monkeypatch.setattr(
         undo_game,
         "reset_models_and_stats",
-        lambda: calls.append(("reset", None)),
+        lambda conn: calls.append(("reset", None)),
     )
     monkeypatch.setattr(
         undo_game,
         "replay_all_but_target",
-        lambda gid: (calls.append(("replay", gid)) or []),
+        lambda conn, gid: (calls.append(("replay", gid)) or []),
     )
     undo_game.main()
 
@@ -48,6 +86,8 @@ def test_fast_path_does_not_replay_all(monkeypatch):
 
     assert ("delete", "abc") in calls
     assert ("recompute_aggregates", None) in calls
+    # Ratings are reverted from history while the participants still exist
+    assert calls.index(("revert", "abc")) < calls.index(("delete", "abc"))
     assert not any(call[0] == "reset" for call in calls)
     assert not any(call[0] == "replay" for call in calls)
 
@@ -58,6 +98,7 @@ def test_replay_all_flag_triggers_full_rebuild(monkeypatch):
 
     assert ("replay", "abc") in calls
     assert ("delete", "abc") in calls
+    assert not any(call[0] == "revert" for call in calls)
     assert not any(call[0] == "recompute_aggregates" for call in calls)
 
 
@@ -66,3 +107,21 @@ def test_dry_run_fast_path_makes_no_changes(monkeypatch):
     run_main(monkeypatch, ["undo_game.py", "--dry-run", "abc"], calls)
 
     assert not calls
+
+
+def test_undo_runs_in_one_committed_transaction(monkeypatch):
+    calls = []
+    pool = FakePool()
+    run_main(monkeypatch, ["undo_game.py", "abc"], calls, pool=pool)
+
+    assert pool.borrowed == pool.returned == 1
+    assert pool.conn.commits == 1
+    assert pool.conn.rollbacks == 0
+
+
+def test_fast_path_missing_game_skips_recompute(monkeypatch):
+    calls = []
+    run_main(monkeypatch, ["undo_game.py", "abc"], calls, exists=False)
+
+    assert ("delete", "abc") in calls
+    assert not any(call[0] == "recompute_aggregates" for call in calls)
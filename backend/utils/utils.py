@@ -1 +1,46 @@
-# Removed load_model_configs - now using Supabase database queries via data_access/api_queries.py
\ No newline at end of file
+"""
+Shared helpers used across the backend.
+
+JSON encoding/decoding prefers orjson (a C implementation that is several
+times faster than the standard library) and falls back to the stdlib json
+module when orjson is not installed.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def json_loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    Decode a JSON document from bytes or str.
+
+    Args:
+        data: Raw JSON payload (bytes are decoded directly, without an
+            intermediate str copy, when orjson is available)
+
+    Returns:
+        The decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Encode an object as a compact JSON string.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        JSON text (str, so it can be bound directly as a psycopg2 parameter)
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'))